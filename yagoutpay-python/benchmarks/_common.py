@@ -0,0 +1,97 @@
+"""
+Shared scaffolding for the benchmark scripts
+
+Importing this module puts ``src`` on ``sys.path``, so the scripts run from
+a checkout without installing the package.
+"""
+
+import asyncio
+import base64
+import os
+import socket
+import sys
+from typing import Any, Dict, Iterable, Tuple
+from urllib.parse import urlencode
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from yagoutpay import YagoutPay  # noqa: E402
+
+MERCHANT_ID = "202508080001"
+ENCRYPTION_KEY = base64.b64encode(b"k" * 32).decode()
+FORM_CONTENT_TYPE = b"application/x-www-form-urlencoded"
+
+Headers = Iterable[Tuple[bytes, bytes]]
+
+
+def signed_callback_body(
+    client: YagoutPay,
+    order_no: str = "RIDE_1700000000000_1234",
+    amount: str = "250.0",
+    status: str = "SUCCESS",
+) -> bytes:
+    """Urlencoded callback body signed the way the gateway signs it"""
+    crypto = client.crypto
+    return urlencode({
+        "order_no": order_no,
+        "amount": amount,
+        "status": status,
+        "hash": crypto.aes_encrypt_base64(crypto.sha256_hex(f"{order_no}{amount}{status}")),
+        "merchant_request": crypto.aes_encrypt_base64(f"{order_no}|{amount}|{status}"),
+    }).encode()
+
+
+def free_port() -> int:
+    """Pick an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def asgi_request(app, method: str, path: str, headers: Headers = (), body: bytes = b"") -> Dict[str, Any]:
+    """
+    Drive one HTTP request through an ASGI app in-process
+
+    The body is delivered in a single message. Later receives, such as
+    Starlette's disconnect listeners, wait until the response is complete
+    and then report a disconnect instead of busy-looping.
+
+    Returns:
+        Dictionary with the response status, headers and body
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"content-length", str(len(body)).encode())] + list(headers),
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    response: Dict[str, Any] = {"status": None, "headers": [], "body": b""}
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    finished = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return response
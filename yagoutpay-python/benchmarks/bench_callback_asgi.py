@@ -0,0 +1,63 @@
+"""
+Benchmark: /callback requests per second, Starlette form handler vs CallbackApp
+
+Both handlers are mounted on the same FastAPI app and driven in-process
+through the ASGI interface, so the numbers reflect framework and parsing cost
+rather than network I/O. Run from the yagoutpay-python directory:
+
+    python benchmarks/bench_callback_asgi.py
+"""
+
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
+
+from _common import ENCRYPTION_KEY, FORM_CONTENT_TYPE, MERCHANT_ID, asgi_request, signed_callback_body
+from yagoutpay import YagoutPay, CallbackApp
+
+REQUESTS = 20000
+
+yagoutpay = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY)
+app = FastAPI()
+
+
+@app.post("/callback-form")
+async def form_callback(request: Request):
+    """Previous demo handler: Starlette form parsing and dict(form_data)"""
+    form_data = await request.form()
+    # Verified off the loop, as CallbackApp does, so only parsing cost differs
+    payment_callback = await run_in_threadpool(yagoutpay.verify_callback, dict(form_data))
+    if payment_callback and payment_callback.status.upper() == "SUCCESS":
+        return RedirectResponse(
+            url=f"/success?order_no={payment_callback.order_no}&amount={payment_callback.amount}",
+            status_code=302,
+        )
+    return RedirectResponse(url="/failure?reason=invalid_callback", status_code=302)
+
+
+app.add_route("/callback", CallbackApp(yagoutpay), methods=["POST"])
+
+
+async def run(path: str, body: bytes) -> float:
+    headers = [(b"content-type", FORM_CONTENT_TYPE)]
+    statuses = set()
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        statuses.add((await asgi_request(app, "POST", path, headers, body))["status"])
+    elapsed = time.perf_counter() - start
+    assert statuses == {302}, statuses
+    return REQUESTS / elapsed
+
+
+async def main():
+    body = signed_callback_body(yagoutpay)
+    for name, path in (("form handler", "/callback-form"), ("CallbackApp", "/callback")):
+        rps = await run(path, body)
+        print(f"{name:>13}: {rps:8.0f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
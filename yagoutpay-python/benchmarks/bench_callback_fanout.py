@@ -0,0 +1,151 @@
+"""
+Benchmark: /callback response latency with serial subscribers vs CallbackDispatcher
+
+Three simulated consumers (ride dispatch, accounting and notifications, each
+with I/O latency and an occasional failure) are notified of every verified
+callback. The serial variant awaits them inline before responding; the
+dispatched variant hands the event to CallbackDispatcher.publish and
+responds immediately. Callbacks for a pool of orders arrive concurrently
+through CallbackApp, driven in-process through the ASGI interface. The script
+checks that every subscriber saw each order's events in publish order. Run
+from the yagoutpay-python directory:
+
+    python benchmarks/bench_callback_fanout.py [CALLBACKS] [ORDERS]
+"""
+
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+
+from starlette.concurrency import run_in_threadpool
+
+from _common import ENCRYPTION_KEY, FORM_CONTENT_TYPE, MERCHANT_ID, asgi_request, signed_callback_body
+from yagoutpay import YagoutPay, CallbackApp, CallbackDispatcher
+
+yagoutpay = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY)
+CONCURRENT_REQUESTS = 50
+
+
+class Consumers:
+    """Simulated internal consumers recording what they receive"""
+
+    def __init__(self, failure_rate: float = 0.02):
+        self.failure_rate = failure_rate
+        self.received = defaultdict(lambda: defaultdict(list))
+
+    async def _consume(self, name, payment_callback, latency):
+        await asyncio.sleep(random.uniform(*latency))
+        if random.random() < self.failure_rate:
+            raise ConnectionError(f"{name} unavailable")
+        self.received[name][payment_callback.order_no].append(payment_callback.status)
+
+    async def dispatch_ride(self, payment_callback):
+        await self._consume("dispatch", payment_callback, (0.005, 0.02))
+
+    async def record_payment(self, payment_callback):
+        await self._consume("accounting", payment_callback, (0.01, 0.04))
+
+    async def notify_customer(self, payment_callback):
+        await self._consume("notifications", payment_callback, (0.02, 0.06))
+
+    def handlers(self):
+        return [self.dispatch_ride, self.record_payment, self.notify_customer]
+
+
+async def post(app, body: bytes) -> float:
+    start = time.perf_counter()
+    response = await asgi_request(app, "POST", "/callback", [(b"content-type", FORM_CONTENT_TYPE)], body)
+    assert response["status"] == 302
+    return time.perf_counter() - start
+
+
+async def drive(app, events):
+    # Events for one order are sent in sequence; orders are interleaved
+    by_order = defaultdict(list)
+    for order_no, status in events:
+        by_order[order_no].append(signed_callback_body(yagoutpay, order_no, status=status))
+    latencies = []
+    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
+
+    async def order_stream(bodies):
+        for body in bodies:
+            async with semaphore:
+                latencies.append(await post(app, body))
+
+    await asyncio.gather(*(order_stream(bodies) for bodies in by_order.values()))
+    return latencies
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def check_order(consumers, expected):
+    for name, orders in consumers.received.items():
+        for order_no, statuses in orders.items():
+            # Delivered events must be a subsequence in publish order
+            it = iter(expected[order_no])
+            assert all(status in it for status in statuses), (name, order_no, statuses)
+
+
+async def main():
+    callbacks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    orders = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    sequence = ["PENDING", "PROCESSING", "SUCCESS", "SETTLED"]
+    events = []
+    expected = defaultdict(list)
+    for n in range(callbacks):
+        order_no = f"RIDE_{n % orders}"
+        status = sequence[len(expected[order_no]) % len(sequence)]
+        expected[order_no].append(status)
+        events.append((order_no, status))
+
+    serial = Consumers()
+    callback_app = CallbackApp(yagoutpay)
+
+    async def serial_app(scope, receive, send):
+        # Inline handler: verify, then await every consumer before responding
+        body = await callback_app._read_body(receive)
+        payment_callback = await run_in_threadpool(yagoutpay.verify_callback, callback_app.parse_body(body))
+        for handler in serial.handlers():
+            try:
+                await handler(payment_callback)
+            except ConnectionError:
+                pass
+        await callback_app._send_status(send, 302, [(b"location", b"/success")])
+
+    start = time.perf_counter()
+    latencies = await drive(serial_app, events)
+    elapsed = time.perf_counter() - start
+    print(f"serial subscribers:   {callbacks} callbacks in {elapsed:.2f}s  "
+          f"p50 {percentile(latencies, 0.5) * 1000:6.1f} ms  p99 {percentile(latencies, 0.99) * 1000:6.1f} ms")
+
+    consumers = Consumers()
+    dispatcher = CallbackDispatcher(max_concurrency=64, timeout=1.0, max_retries=3, retry_backoff=0.01)
+    dispatcher.subscribe(consumers.dispatch_ride, name="dispatch")
+    dispatcher.subscribe(consumers.record_payment, name="accounting")
+    dispatcher.subscribe(consumers.notify_customer, name="notifications")
+
+    start = time.perf_counter()
+    latencies = await drive(CallbackApp(yagoutpay, on_verified=dispatcher.publish), events)
+    elapsed = time.perf_counter() - start
+    await dispatcher.join()
+    delivered = time.perf_counter() - start
+    await dispatcher.close()
+    print(f"CallbackDispatcher:   {callbacks} callbacks in {elapsed:.2f}s  "
+          f"p50 {percentile(latencies, 0.5) * 1000:6.1f} ms  p99 {percentile(latencies, 0.99) * 1000:6.1f} ms  "
+          f"(all subscribers done after {delivered:.2f}s)")
+
+    check_order(consumers, expected)
+    stats = dispatcher.stats()
+    for name, counters in stats["subscribers"].items():
+        assert counters.get("delivered", 0) + counters.get("failed", 0) == callbacks
+        print(f"  {name}: {counters}")
+    print("per-order delivery order preserved for every subscriber")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
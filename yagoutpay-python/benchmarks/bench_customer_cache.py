@@ -0,0 +1,86 @@
+"""
+Benchmark: create_payment for returning customers with and without CustomerProfileCache
+
+Run from the yagoutpay-python directory:
+
+    python benchmarks/bench_customer_cache.py
+"""
+
+import time
+
+from _common import ENCRYPTION_KEY, MERCHANT_ID
+from yagoutpay import (
+    YagoutPay, CustomerProfileCache, PaymentRequest, TransactionDetails,
+    CustomerDetails, BillingDetails,
+)
+
+CUSTOMERS = 1000
+ORDERS = 50000
+
+
+def build_profiles():
+    profiles = []
+    for i in range(CUSTOMERS):
+        profiles.append((
+            CustomerDetails(
+                cust_name=f"Rider {i}",
+                email_id=f"rider{i}@example.com",
+                mobile_no=f"09{i:08d}",
+                unique_id=f"CUST_{i}",
+            ),
+            BillingDetails(
+                bill_address=f"{i} Bole Road",
+                bill_city="Addis Ababa",
+                bill_state="Addis Ababa",
+                bill_country="Ethiopia",
+            ),
+        ))
+    return profiles
+
+
+def run(client, profiles):
+    start = time.perf_counter()
+    for n in range(ORDERS):
+        customer, billing = profiles[n % CUSTOMERS]
+        client.create_payment(PaymentRequest.model_construct(
+            transaction=TransactionDetails.model_construct(
+                order_no=f"RIDE_{n}",
+                amount=250.0,
+                country="ETH",
+                currency="ETB",
+                txn_type="SALE",
+                success_url="https://example.com/success",
+                failure_url="https://example.com/failure",
+                channel="WEB",
+            ),
+            customer=customer,
+            billing=billing,
+        ))
+    return time.perf_counter() - start
+
+
+def main():
+    profiles = build_profiles()
+    plain = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY)
+    cache = CustomerProfileCache(max_size=CUSTOMERS)
+    cached = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY, customer_cache=cache)
+
+    # Outputs must be byte-identical
+    sample = PaymentRequest(
+        transaction=TransactionDetails(
+            order_no="RIDE_CHECK", amount=100,
+            success_url="https://example.com/s", failure_url="https://example.com/f",
+        ),
+        customer=profiles[0][0],
+        billing=profiles[0][1],
+    )
+    assert plain.create_payment(sample) == cached.create_payment(sample)
+
+    for name, client in (("no cache", plain), ("profile cache", cached)):
+        elapsed = run(client, profiles)
+        print(f"{name:>14}: {ORDERS / elapsed:10.0f} payments/s ({elapsed * 1e6 / ORDERS:.1f} us/payment)")
+    print(f"cache hits={cache.hits} misses={cache.misses} size={len(cache)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: OrderIndex at tens of millions of issued orders
+
+Measures insert and lookup throughput, the observed false-positive rate,
+serialized size and load time. Run from the yagoutpay-python directory:
+
+    python benchmarks/bench_order_index.py [ORDERS] [FP_RATE]
+
+Defaults to 20,000,000 orders at a 0.1% false-positive rate.
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from yagoutpay import OrderIndex  # noqa: E402
+
+LOOKUPS = 200000
+
+
+def main():
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 20000000
+    fp_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.001
+    days = 7
+    now = time.time()
+
+    index = OrderIndex(
+        capacity_per_partition=orders // days + 1, fp_rate=fp_rate, max_partitions=days
+    )
+
+    start = time.perf_counter()
+    for n in range(orders):
+        day = n % days
+        index.add(f"RIDE_{n}", now=now - (days - 1 - day) * 86400)
+    elapsed = time.perf_counter() - start
+    print(f"insert:  {orders / elapsed:10.0f} orders/s ({orders} orders, {elapsed:.1f}s)")
+
+    start = time.perf_counter()
+    for n in range(0, orders, max(1, orders // LOOKUPS)):
+        assert index.contains(f"RIDE_{n}", now=now)
+    elapsed = time.perf_counter() - start
+    print(f"known:   {LOOKUPS / elapsed:10.0f} lookups/s")
+
+    start = time.perf_counter()
+    false_positives = sum(index.contains(f"FAKE_{n}", now=now) for n in range(LOOKUPS))
+    elapsed = time.perf_counter() - start
+    print(f"unknown: {LOOKUPS / elapsed:10.0f} lookups/s")
+    print(f"false positives: {false_positives / LOOKUPS:.4%} (target {fp_rate:.4%})")
+
+    buffer = io.BytesIO()
+    index.dump(buffer)
+    size = buffer.tell()
+    buffer.seek(0)
+    start = time.perf_counter()
+    OrderIndex.load(buffer)
+    elapsed = time.perf_counter() - start
+    print(f"serialized: {size / 1e6:.1f} MB, load {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: payment initiation latency, HTML form vs JSON
+
+Compares three endpoints driven in-process through the ASGI interface:
+
+- /pay: create_payment_form returned as HTML (current redirect page)
+- /api/payments-generic: PaymentResponse returned through FastAPI's JSON encoder
+- /api/payments: create_payment_json bytes (orjson when installed)
+
+Run from the yagoutpay-python directory:
+
+    python benchmarks/bench_payment_json.py
+"""
+
+import asyncio
+import importlib.util
+import json
+import statistics
+import time
+from urllib.parse import urlencode
+
+from fastapi import FastAPI, Form
+from fastapi.responses import HTMLResponse, Response
+from pydantic import BaseModel
+
+from _common import ENCRYPTION_KEY, FORM_CONTENT_TYPE, MERCHANT_ID, asgi_request
+from yagoutpay import (
+    YagoutPay, PaymentRequest, TransactionDetails, CustomerDetails, BillingDetails,
+)
+
+REQUESTS = 5000
+
+yagoutpay = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY)
+app = FastAPI()
+
+
+class Booking(BaseModel):
+    customer_name: str
+    email_id: str
+    mobile_no: str
+    pickup_address: str
+    amount: float
+
+
+def build(customer_name, email_id, mobile_no, pickup_address, amount):
+    order_no = yagoutpay.generate_order_number("RIDE")
+    return PaymentRequest(
+        transaction=TransactionDetails(
+            order_no=order_no,
+            amount=amount,
+            success_url=f"http://localhost:8080/success?order_no={order_no}",
+            failure_url=f"http://localhost:8080/failure?order_no={order_no}",
+        ),
+        customer=CustomerDetails(cust_name=customer_name, email_id=email_id, mobile_no=mobile_no),
+        billing=BillingDetails(bill_address=pickup_address, bill_city="Addis Ababa"),
+    )
+
+
+@app.post("/pay")
+async def pay(
+    customer_name: str = Form(...),
+    email_id: str = Form(...),
+    mobile_no: str = Form(...),
+    pickup_address: str = Form(...),
+    amount: float = Form(...),
+):
+    payment_request = build(customer_name, email_id, mobile_no, pickup_address, amount)
+    return HTMLResponse(content=yagoutpay.create_payment_form(payment_request))
+
+
+@app.post("/api/payments-generic")
+async def payments_generic(booking: Booking):
+    payment_request = build(**booking.model_dump())
+    return yagoutpay.create_payment(payment_request).model_dump()
+
+
+@app.post("/api/payments")
+async def payments(booking: Booking):
+    payment_request = build(**booking.model_dump())
+    return Response(content=yagoutpay.create_payment_json(payment_request), media_type="application/json")
+
+
+BOOKING = {
+    "customer_name": "Abebe Kebede",
+    "email_id": "abebe@example.com",
+    "mobile_no": "0911234567",
+    "pickup_address": "Bole Road",
+    "amount": 250.0,
+}
+
+
+async def run(path: str, content_type: bytes, body: bytes):
+    headers = [(b"content-type", content_type)]
+    latencies = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        response = await asgi_request(app, "POST", path, headers, body)
+        latencies.append(time.perf_counter() - start)
+        assert response["status"] == 200, response
+    latencies.sort()
+    return statistics.mean(latencies), latencies[int(len(latencies) * 0.99)], len(response["body"])
+
+
+async def main():
+    form = (FORM_CONTENT_TYPE, urlencode(BOOKING).encode())
+    body = (b"application/json", json.dumps(BOOKING).encode())
+    cases = [
+        ("HTML form", "/pay", form),
+        ("generic JSON", "/api/payments-generic", body),
+        ("create_payment_json", "/api/payments", body),
+    ]
+    print(f"orjson installed: {importlib.util.find_spec('orjson') is not None}")
+    for name, path, (content_type, payload) in cases:
+        mean, p99, size = await run(path, content_type, payload)
+        print(f"{name:>20}: mean {mean * 1e6:7.1f} us  p99 {p99 * 1e6:7.1f} us  body {size} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Benchmark: PendingPaymentTracker with a million concurrently pending orders
+
+Tracks ORDERS orders spread over the timeout window, resolves half of them
+as if their callbacks arrived, then advances past the timeout so the rest
+expire. Reports per-operation cost and the tracker's memory footprint.
+Run from the yagoutpay-python directory:
+
+    python benchmarks/bench_pending_tracker.py [ORDERS]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from yagoutpay import PendingPaymentTracker  # noqa: E402
+
+TIMEOUT = 900.0
+
+
+def main():
+    orders = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    order_nos = [f"RIDE_{1700000000000 + n}_{n % 9000 + 1000}" for n in range(orders)]
+    expired = []
+    start_time = time.time()
+
+    # Memory footprint, measured on a separate tracker since tracing slows it down
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracker = PendingPaymentTracker(timeout=TIMEOUT)
+    step = TIMEOUT / orders
+    for n, order_no in enumerate(order_nos):
+        tracker.track(order_no, now=start_time + n * step)
+    memory = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del tracker
+
+    tracker = PendingPaymentTracker(timeout=TIMEOUT, on_expire=expired.append)
+
+    # Orders arrive evenly over one timeout window
+    start = time.perf_counter()
+    for n, order_no in enumerate(order_nos):
+        tracker.track(order_no, now=start_time + n * step)
+    elapsed = time.perf_counter() - start
+    print(f"track:   {elapsed * 1e9 / orders:7.0f} ns/order  ({len(tracker)} pending)")
+    print(f"memory:  {memory / 1e6:7.1f} MB ({memory / orders:.0f} bytes/order, excluding order strings)")
+
+    start = time.perf_counter()
+    for order_no in order_nos[::2]:
+        tracker.resolve(order_no)
+    elapsed = time.perf_counter() - start
+    print(f"resolve: {elapsed * 1e9 / (orders // 2):7.0f} ns/order")
+
+    # Advance second by second, as the background task would
+    end_time = start_time + 2 * TIMEOUT + 1
+    now = start_time
+    ticks = 0
+    start = time.perf_counter()
+    while now < end_time:
+        now += 1
+        tracker.advance(now)
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    print(f"expire:  {elapsed * 1e9 / max(len(expired), 1):7.0f} ns/order  ({len(expired)} expired over {ticks} ticks)")
+    assert len(expired) == orders - len(order_nos[::2]) and len(tracker) == 0
+
+
+if __name__ == "__main__":
+    main()
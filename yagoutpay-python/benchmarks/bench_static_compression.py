@@ -0,0 +1,95 @@
+"""
+Benchmark: bytes on the wire and response time for demo static assets and HTML
+
+Compares, in-process through the ASGI interface:
+
+- styles.css via a plain StaticFiles mount (before) vs the precompressed,
+  fingerprinted build (after), including a conditional revalidation
+- the /pay redirect page uncompressed (before) vs compressed on the fly (after)
+
+Run `python demo/build_static.py` first, then from the yagoutpay-python directory:
+
+    python benchmarks/bench_static_compression.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from urllib.parse import urlencode
+
+from _common import ENCRYPTION_KEY, FORM_CONTENT_TYPE, MERCHANT_ID, ROOT, asgi_request
+
+sys.path.insert(0, ROOT)
+os.environ.setdefault("MERCHANT_ID", MERCHANT_ID)
+os.environ.setdefault("ENCRYPTION_KEY", ENCRYPTION_KEY)
+os.environ["ADMISSION_CONTROL"] = "off"
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.routing import Mount  # noqa: E402
+from starlette.staticfiles import StaticFiles  # noqa: E402
+
+from demo.main import app, static_assets  # noqa: E402
+
+REQUESTS = 2000
+
+plain_static = Starlette(routes=[Mount("/static", StaticFiles(directory="demo/static"))])
+
+PAY_BODY = urlencode({
+    "customer_name": "Abebe Kebede",
+    "email_id": "abebe@example.com",
+    "mobile_no": "0911234567",
+    "pickup_address": "Bole Road",
+    "dropoff_address": "Piazza",
+    "distance": "5",
+    "ride_type": "comfort",
+    "amount": "275",
+}).encode()
+
+
+def wire_bytes(response):
+    # Status line plus headers plus body, as HTTP/1.1 would send them
+    head = 17 + sum(len(k) + len(v) + 4 for k, v in response["headers"]) + 2
+    return head + len(response["body"])
+
+
+async def measure(name, asgi_app, method, path, headers=(), body=b""):
+    response = await asgi_request(asgi_app, method, path, headers, body)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await asgi_request(asgi_app, method, path, headers, body)
+    elapsed = (time.perf_counter() - start) / REQUESTS
+    print(f"{name:>38}: {response['status']}  {wire_bytes(response):6d} bytes  {elapsed * 1e6:7.1f} us")
+    return response
+
+
+async def main():
+    if not static_assets.manifest:
+        print("No build found; run `python demo/build_static.py` first")
+        return
+
+    accept = [(b"accept-encoding", b"gzip, deflate, br")]
+    css = static_assets.url("css/styles.css")
+
+    print("styles.css")
+    plain = await measure("before: StaticFiles", plain_static, "GET", "/static/css/styles.css", accept)
+    etag = dict(plain["headers"]).get(b"etag")
+    await measure("before: revalidate (If-None-Match)", plain_static, "GET", "/static/css/styles.css",
+                  accept + [(b"if-none-match", etag)])
+    for encoding in (b"br", b"gzip"):
+        await measure(f"after: precompressed {encoding.decode()}", app, "GET", css,
+                      [(b"accept-encoding", encoding)])
+    built = await asgi_request(app, "GET", css, [(b"accept-encoding", b"br")])
+    await measure("after: revalidate (If-None-Match)", app, "GET", css,
+                  [(b"accept-encoding", b"br"), (b"if-none-match", dict(built["headers"])[b"etag"])])
+    print("  (after: fingerprinted URL is immutable, so repeat visits skip the request entirely)")
+
+    print("/pay redirect page")
+    form = [(b"content-type", FORM_CONTENT_TYPE)]
+    await measure("before: uncompressed", app, "POST", "/pay", form + [(b"accept-encoding", b"identity")], PAY_BODY)
+    await measure("after: gzip", app, "POST", "/pay", form + [(b"accept-encoding", b"gzip")], PAY_BODY)
+    await measure("after: br", app, "POST", "/pay", form + [(b"accept-encoding", b"br")], PAY_BODY)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""
+Load test: demo /pay and /callback latency under a surge, with and without admission control
+
+Starts the demo app under uvicorn twice (ADMISSION_CONTROL=off, then on) and
+drives it open-loop at a fixed arrival rate: 90% checkouts from a pool of
+client IPs (sent as X-Forwarded-For) and 10% callbacks. Reports latency
+percentiles per request kind and the demo's /metrics counters. Run from the
+yagoutpay-python directory:
+
+    python benchmarks/load_admission.py [RATE] [SECONDS]
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlencode
+
+from _common import ENCRYPTION_KEY, MERCHANT_ID, ROOT, free_port, signed_callback_body
+from yagoutpay import YagoutPay
+
+CLIENT_IPS = [f"10.0.{n // 250}.{n % 250 + 1}" for n in range(500)]
+
+
+CHECKOUT_BODY = urlencode({
+    "customer_name": "Abebe Kebede",
+    "email_id": "abebe@example.com",
+    "mobile_no": "0911234567",
+    "pickup_address": "Bole Road",
+    "dropoff_address": "Piazza",
+    "distance": "5",
+    "ride_type": "comfort",
+    "amount": "275",
+}).encode()
+CALLBACK_BODY = signed_callback_body(YagoutPay(MERCHANT_ID, ENCRYPTION_KEY))
+
+
+async def send_request(port: int, path: str, body: bytes, client_ip: str, timeout: float):
+    request = (
+        f"POST {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"X-Forwarded-For: {client_ip}\r\n"
+        "Content-Type: application/x-www-form-urlencoded\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+    ).encode() + body
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+        writer.write(request)
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+        status = int(status_line.split()[1])
+    except (asyncio.TimeoutError, OSError, IndexError, ValueError):
+        status = 0
+    return status, time.perf_counter() - start
+
+
+async def drive(port: int, rate: float, seconds: float):
+    results = defaultdict(list)
+    tasks = []
+    start = time.perf_counter()
+
+    async def one(kind, path, body, client_ip):
+        status, latency = await send_request(port, path, body, client_ip, timeout=30)
+        results[kind].append((status, latency))
+
+    for n in range(int(rate * seconds)):
+        delay = start + n / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if random.random() < 0.1:
+            tasks.append(asyncio.ensure_future(one("callback", "/callback", CALLBACK_BODY, "203.0.113.10")))
+        else:
+            ip = random.choice(CLIENT_IPS)
+            tasks.append(asyncio.ensure_future(one("checkout", "/pay", CHECKOUT_BODY, ip)))
+    await asyncio.gather(*tasks)
+    return results
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else float("nan")
+
+
+def report(results):
+    for kind in ("checkout", "callback"):
+        entries = results[kind]
+        statuses = Counter(status for status, _ in entries)
+        served = [lat for status, lat in entries if status in (200, 302)]
+        shed = [lat for status, lat in entries if status in (429, 503)]
+        print(
+            f"  {kind:>8}: {dict(sorted(statuses.items()))}"
+            f"  served p50 {percentile(served, 0.5) * 1000:6.0f} ms p99 {percentile(served, 0.99) * 1000:6.0f} ms"
+            + (f"  shed p99 {percentile(shed, 0.99) * 1000:5.0f} ms" if shed else "")
+        )
+
+
+def fetch_metrics(port: int):
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.sendall(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    return json.loads(data.split(b"\r\n\r\n", 1)[1])
+
+
+async def main():
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 400
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    for mode in ("off", "on"):
+        port = free_port()
+        env = dict(
+            os.environ,
+            MERCHANT_ID=MERCHANT_ID,
+            ENCRYPTION_KEY=ENCRYPTION_KEY,
+            ADMISSION_CONTROL=mode,
+        )
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "demo.main:app", "--port", str(port),
+                "--log-level", "error", "--proxy-headers", "--forwarded-allow-ips", "*",
+            ],
+            cwd=ROOT, env=env,
+        )
+        try:
+            for _ in range(100):
+                try:
+                    socket.create_connection(("127.0.0.1", port)).close()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            results = await drive(port, rate, seconds)
+            print(f"admission control {mode} ({rate:.0f} req/s for {seconds:.0f}s):")
+            report(results)
+            if mode == "on":
+                print(f"  metrics: {fetch_metrics(port)['counters']}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Build fingerprinted, precompressed static assets for the demo
+
+Copies every file under demo/static to build/static under a content-hashed
+name (css/styles.css -> css/styles.<hash>.css), writes .gz and, when the
+brotli package is installed, .br variants next to compressible files, and
+records the mapping in build/static/manifest.json. Run from the
+yagoutpay-python directory:
+
+    python demo/build_static.py
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+SOURCE_DIR = os.path.join("demo", "static")
+BUILD_DIR = os.path.join("build", "static")
+COMPRESSIBLE = (".css", ".js", ".svg", ".html", ".json", ".txt", ".map")
+
+
+def build(source_dir: str = SOURCE_DIR, build_dir: str = BUILD_DIR) -> dict:
+    if os.path.isdir(build_dir):
+        shutil.rmtree(build_dir)
+    os.makedirs(build_dir)
+
+    manifest = {}
+    for root, _, files in os.walk(source_dir):
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, source_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                data = f.read()
+
+            stem, ext = os.path.splitext(logical)
+            fingerprinted = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+            manifest[logical] = fingerprinted
+
+            target = os.path.join(build_dir, fingerprinted)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(data)
+
+            if ext.lower() not in COMPRESSIBLE:
+                continue
+            variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants[".br"] = brotli.compress(data, quality=11)
+            for suffix, compressed in variants.items():
+                # Only keep variants that actually save bytes
+                if len(compressed) < len(data):
+                    with open(target + suffix, "wb") as f:
+                        f.write(compressed)
+
+    with open(os.path.join(build_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == "__main__":
+    manifest = build(*sys.argv[1:3])
+    print(f"Built {len(manifest)} assets into {sys.argv[2] if len(sys.argv) > 2 else BUILD_DIR}"
+          + ("" if brotli else " (brotli not installed, gzip only)"))
@@ -2,35 +2,239 @@
 FastAPI Demo for YagoutPay Python SDK
 """
 
+import gzip
+import hashlib
+import json
+import mimetypes
 import os
-from typing import Dict, Any
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Tuple
 from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from dotenv import load_dotenv
 
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
 # Import YagoutPay SDK
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-from yagoutpay import YagoutPay, PaymentRequest, TransactionDetails, CustomerDetails, BillingDetails
+from yagoutpay import YagoutPay, CallbackApp, CallbackDispatcher, PaymentCallback, PaymentRequest, TransactionDetails, CustomerDetails, BillingDetails
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Drain the callback dispatcher on shutdown"""
+    yield
+    # Let queued callback deliveries finish before the worker exits
+    await callback_dispatcher.close(timeout=float(os.getenv("CALLBACK_SHUTDOWN_TIMEOUT", "30")))
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="RideYagout - Python SDK Demo",
     description="FastAPI demo for YagoutPay Python SDK with ride booking functionality",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="demo/static"), name="static")
+
+def accepted_encodings(scope) -> set:
+    """Content codings the client accepts (q=0 excluded)"""
+    for name, value in scope.get("headers", []):
+        if name == b"accept-encoding":
+            encodings = set()
+            for item in value.decode("latin-1").split(","):
+                coding, _, params = item.strip().partition(";")
+                if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                    encodings.add(coding.strip().lower())
+            return encodings
+    return set()
+
+
+class StaticAssets:
+    """In-memory static file server with precompressed variants and strong ETags
+    
+    Serves the fingerprinted files produced by ``demo/build_static.py``
+    (with their .br/.gz variants, negotiated via Accept-Encoding and cached
+    as immutable) when ``build_dir`` has a manifest, and falls back to the
+    plain source files otherwise. Original asset names stay reachable and
+    are revalidated on every use (``no-cache``) since their content changes
+    between builds.
+    """
+    
+    IMMUTABLE = b"public, max-age=31536000, immutable"
+    REVALIDATE = b"no-cache"
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+    
+    def __init__(self, source_dir: str, build_dir: str, prefix: str = "/static/"):
+        self.prefix = prefix
+        self.manifest: Dict[str, str] = {}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        
+        manifest_path = os.path.join(build_dir, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+            for logical, fingerprinted in self.manifest.items():
+                variants = self._load_variants(os.path.join(build_dir, fingerprinted))
+                self.files[fingerprinted] = {"variants": variants, "cache_control": self.IMMUTABLE}
+                self.files[logical] = {"variants": variants, "cache_control": self.REVALIDATE}
+        else:
+            for root, _, names in os.walk(source_dir):
+                for name in names:
+                    path = os.path.join(root, name)
+                    logical = os.path.relpath(path, source_dir).replace(os.sep, "/")
+                    self.files[logical] = {"variants": self._load_variants(path), "cache_control": self.REVALIDATE}
+        
+        for logical, entry in self.files.items():
+            content_type = mimetypes.guess_type(logical)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type in ("application/javascript", "image/svg+xml"):
+                content_type += "; charset=utf-8"
+            entry["content_type"] = content_type.encode("latin-1")
+    
+    def _load_variants(self, path: str) -> Dict[str, Tuple[bytes, bytes]]:
+        variants = {}
+        for encoding, suffix in (("identity", ""),) + self.ENCODINGS:
+            if os.path.exists(path + suffix):
+                with open(path + suffix, "rb") as f:
+                    data = f.read()
+                # Strong ETag per representation, derived from its bytes
+                etag = f'"{hashlib.sha256(data).hexdigest()[:32]}"'.encode("latin-1")
+                variants[encoding] = (data, etag)
+        return variants
+    
+    def url(self, path: str) -> str:
+        """URL for a static asset, fingerprinted when a build is available"""
+        return self.prefix + self.manifest.get(path, path)
+    
+    @staticmethod
+    def _opaque_tag(tag: bytes) -> bytes:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith(b"W/") else tag
+    
+    async def __call__(self, scope, receive, send):
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        entry = self.files.get(path.lstrip("/"))
+        
+        if scope["method"] not in ("GET", "HEAD") or entry is None:
+            status = 405 if entry is not None else 404
+            await send({"type": "http.response.start", "status": status, "headers": [(b"content-length", b"0")]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        variants = entry["variants"]
+        accepted = accepted_encodings(scope)
+        encoding = next((e for e, _ in self.ENCODINGS if e in variants and e in accepted), "identity")
+        data, etag = variants[encoding]
+        
+        headers = [(b"etag", etag), (b"cache-control", entry["cache_control"])]
+        if len(variants) > 1:
+            headers.append((b"vary", b"Accept-Encoding"))
+        
+        # If-None-Match uses the weak comparison: W/"x" matches "x"
+        if_none_match = next((v for k, v in scope.get("headers", []) if k == b"if-none-match"), None)
+        if if_none_match is not None and (
+            if_none_match.strip() == b"*"
+            or etag in [self._opaque_tag(t) for t in if_none_match.split(b",")]
+        ):
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        
+        headers += [(b"content-type", entry["content_type"]), (b"content-length", str(len(data)).encode())]
+        if encoding != "identity":
+            headers.append((b"content-encoding", encoding.encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else data})
+
+
+class HTMLCompressionMiddleware:
+    """Compress generated HTML responses of at least ``minimum_size`` bytes
+    
+    Uses brotli when installed and accepted by the client, gzip otherwise.
+    Responses that already carry a Content-Encoding are left untouched.
+    """
+    
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        accepted = accepted_encodings(scope)
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        chunks = []
+        
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                is_html = headers.get(b"content-type", b"").startswith(b"text/html")
+                if is_html and b"content-encoding" not in headers:
+                    start_message = message
+                    return
+                await send(message)
+            elif message["type"] == "http.response.body" and start_message is not None:
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                body = b"".join(chunks)
+                headers = [(k, v) for k, v in start_message.get("headers", []) if k.lower() != b"content-length"]
+                if len(body) >= self.minimum_size:
+                    if encoding == "br":
+                        body = brotli.compress(body, quality=5)
+                    else:
+                        body = gzip.compress(body, compresslevel=6)
+                    headers.append((b"content-encoding", encoding.encode()))
+                headers.append((b"content-length", str(len(body)).encode()))
+                if not any(k.lower() == b"vary" for k, _ in headers):
+                    headers.append((b"vary", b"Accept-Encoding"))
+                await send({**start_message, "headers": headers})
+                await send({"type": "http.response.body", "body": body})
+            else:
+                await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
+
+
+# Static files: fingerprinted and precompressed when `python demo/build_static.py` has run
+static_assets = StaticAssets("demo/static", os.getenv("STATIC_BUILD_DIR", "build/static"))
+app.mount("/static", static_assets, name="static")
 
 # Templates
 templates = Jinja2Templates(directory="demo/templates")
+templates.env.globals["static_url"] = static_assets.url
+
+# Compress generated HTML pages (redirect form, templates) on the fly
+app.add_middleware(
+    HTMLCompressionMiddleware,
+    minimum_size=int(os.getenv("HTML_COMPRESSION_MIN_SIZE", "1024")),
+)
 
 # Initialize YagoutPay client from environment (no hardcoded fallbacks)
 MERCHANT_ID = os.getenv("MERCHANT_ID")
@@ -52,6 +256,143 @@ yagoutpay = YagoutPay(
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8080")
 
 
+class AdmissionController:
+    """Load shedding for checkout and callback requests
+    
+    Checkouts (/pay, /api/payments) pass a token bucket per client IP and
+    may only use ``max_in_flight - callback_reserved`` slots. Callbacks skip
+    the per-IP bucket and may use every slot, so they keep flowing while new
+    checkouts are shed. Shed requests get an immediate 429 (rate limited) or
+    503 (overloaded) with Retry-After instead of queueing behind the crypto.
+    """
+    
+    CHECKOUT_PATHS = frozenset(["/pay", "/api/payments"])
+    CALLBACK_PATHS = frozenset(["/callback"])
+    
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: float = 10.0,
+        max_in_flight: int = 64,
+        callback_reserved: int = 16,
+        max_clients: int = 100000,
+    ):
+        if rate <= 0:
+            raise ValueError(f"RATE_LIMIT_PER_IP must be greater than 0 (got {rate})")
+        if burst < 1:
+            raise ValueError(f"RATE_LIMIT_BURST must be at least 1 (got {burst})")
+        if max_in_flight < 1:
+            raise ValueError(f"MAX_IN_FLIGHT must be at least 1 (got {max_in_flight})")
+        if not 0 <= callback_reserved < max_in_flight:
+            raise ValueError(
+                f"CALLBACK_RESERVED must be between 0 and MAX_IN_FLIGHT - 1 "
+                f"(got {callback_reserved} with MAX_IN_FLIGHT={max_in_flight})"
+            )
+        
+        self.enabled = True
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.checkout_limit = max_in_flight - callback_reserved
+        self.max_clients = max_clients
+        self.in_flight = 0
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.metrics: Counter = Counter()
+    
+    def take_token(self, client_ip: str, now: float) -> float:
+        """Take a token for client_ip; returns 0 if allowed, else seconds until the next token"""
+        tokens, last = self.buckets.pop(client_ip, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / self.rate
+        self.buckets[client_ip] = (tokens, now)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return wait
+    
+    def admit(self, kind: str, client_ip: str) -> Tuple[int, float]:
+        """Returns (0, 0) if admitted, else (status code, Retry-After seconds)"""
+        if kind == "checkout":
+            if self.in_flight >= self.checkout_limit:
+                return 503, 1.0
+            wait = self.take_token(client_ip, time.monotonic())
+            if wait:
+                return 429, wait
+        elif self.in_flight >= self.max_in_flight:
+            return 503, 1.0
+        return 0, 0.0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "checkout_limit": self.checkout_limit,
+            "tracked_clients": len(self.buckets),
+            "counters": dict(self.metrics),
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to /pay and /callback"""
+    
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+    
+    async def __call__(self, scope, receive, send):
+        controller = self.controller
+        if scope["type"] != "http" or not controller.enabled or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        
+        path = scope["path"]
+        if path in controller.CHECKOUT_PATHS:
+            kind = "checkout"
+        elif path in controller.CALLBACK_PATHS:
+            kind = "callback"
+        else:
+            await self.app(scope, receive, send)
+            return
+        
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        status, retry_after = controller.admit(kind, client_ip)
+        if status:
+            controller.metrics[f"{kind}_shed_{status}"] += 1
+            body = b"Too many requests" if status == 429 else b"Server busy"
+            await send({
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+                    (b"content-type", b"text/plain"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        controller.metrics[f"{kind}_admitted"] += 1
+        controller.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.in_flight -= 1
+
+
+admission = AdmissionController(
+    rate=float(os.getenv("RATE_LIMIT_PER_IP", "5")),
+    burst=float(os.getenv("RATE_LIMIT_BURST", "10")),
+    max_in_flight=int(os.getenv("MAX_IN_FLIGHT", "64")),
+    callback_reserved=int(os.getenv("CALLBACK_RESERVED", "16")),
+)
+admission.enabled = os.getenv("ADMISSION_CONTROL", "on").lower() not in ("0", "off", "false")
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+
 class RideBookingRequest(BaseModel):
     """Ride booking request model"""
     customer_name: str
@@ -64,30 +405,20 @@ class RideBookingRequest(BaseModel):
     amount: float
 
 
-@app.get("/", response_class=HTMLResponse)
-async def home(request: Request):
-    """Home page with ride booking form"""
-    return templates.TemplateResponse("index.html", {"request": request})
-
-
-@app.post("/pay")
-async def book_ride(
-    customer_name: str = Form(...),
-    email_id: str = Form(...),
-    mobile_no: str = Form(...),
-    pickup_address: str = Form(...),
-    dropoff_address: str = Form(...),
-    distance: float = Form(...),
-    ride_type: str = Form("comfort"),
-    amount: float = Form(...)
-):
-    """Process ride booking and redirect to payment"""
+def build_payment_request(
+    customer_name: str,
+    email_id: str,
+    mobile_no: str,
+    pickup_address: str,
+    ride_type: str,
+    amount: float,
+) -> PaymentRequest:
+    """Build a payment request for a ride booking"""
     
     # Generate order number
     order_no = yagoutpay.generate_order_number("RIDE")
     
-    # Create payment request
-    payment_request = PaymentRequest(
+    return PaymentRequest(
         transaction=TransactionDetails(
             order_no=order_no,
             amount=amount,
@@ -106,13 +437,61 @@ async def book_ride(
             bill_country="Ethiopia"
         )
     )
+
+
+@app.get("/", response_class=HTMLResponse)
+async def home(request: Request):
+    """Home page with ride booking form"""
+    return templates.TemplateResponse("index.html", {"request": request})
+
+
+@app.post("/pay")
+async def book_ride(
+    customer_name: str = Form(...),
+    email_id: str = Form(...),
+    mobile_no: str = Form(...),
+    pickup_address: str = Form(...),
+    dropoff_address: str = Form(...),
+    distance: float = Form(...),
+    ride_type: str = Form("comfort"),
+    amount: float = Form(...)
+):
+    """Process ride booking and redirect to payment"""
+    
+    payment_request = build_payment_request(
+        customer_name, email_id, mobile_no, pickup_address, ride_type, amount
+    )
     
-    # Generate payment form
-    payment_form = yagoutpay.create_payment_form(payment_request)
+    # Generate payment form off the event loop so admission control sees the backlog
+    payment_form = await run_in_threadpool(yagoutpay.create_payment_form, payment_request)
     
     return HTMLResponse(content=payment_form)
 
 
+@app.post("/api/payments")
+async def create_payment_api(booking: RideBookingRequest):
+    """Create a payment for mobile/SPA clients and return the gateway fields as JSON"""
+    try:
+        payment_request = build_payment_request(
+            booking.customer_name,
+            booking.email_id,
+            booking.mobile_no,
+            booking.pickup_address,
+            booking.ride_type,
+            booking.amount,
+        )
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=422,
+            detail=exc.errors(include_url=False, include_context=False, include_input=False),
+        )
+    
+    return Response(
+        content=await run_in_threadpool(yagoutpay.create_payment_json, payment_request),
+        media_type="application/json",
+    )
+
+
 @app.api_route("/success", methods=["GET", "POST"], response_class=HTMLResponse)
 async def success(request: Request):
     if request.method == "POST":
@@ -166,33 +545,52 @@ async def failure(request: Request):
     })
 
 
-@app.post("/callback")
-async def payment_callback(request: Request):
-    """Handle payment callback from YagoutPay"""
-    form_data = await request.form()
-    callback_data = dict(form_data)
-    
-    # Verify callback
-    payment_callback = yagoutpay.verify_callback(callback_data)
-    
-    if payment_callback:
-        # Payment verified successfully
-        if payment_callback.status.upper() == "SUCCESS":
-            return RedirectResponse(
-                url=f"/success?order_no={payment_callback.order_no}&amount={payment_callback.amount}",
-                status_code=302
-            )
-        else:
-            return RedirectResponse(
-                url=f"/failure?order_no={payment_callback.order_no}&reason={payment_callback.status}",
-                status_code=302
-            )
-    else:
-        # Invalid callback
-        return RedirectResponse(
-            url="/failure?reason=invalid_callback",
-            status_code=302
-        )
+# Verified callbacks fan out to internal consumers after the redirect is sent
+recent_events: Dict[str, deque] = {
+    "dispatch": deque(maxlen=100),
+    "accounting": deque(maxlen=100),
+    "notifications": deque(maxlen=100),
+}
+callback_dispatcher = CallbackDispatcher(
+    max_concurrency=int(os.getenv("CALLBACK_MAX_CONCURRENCY", "32")),
+    timeout=float(os.getenv("CALLBACK_HANDLER_TIMEOUT", "10")),
+)
+
+
+async def dispatch_ride(payment_callback: PaymentCallback):
+    """Release the ride to dispatch once it is paid"""
+    if payment_callback.status.upper() == "SUCCESS":
+        recent_events["dispatch"].append(payment_callback.order_no)
+
+
+def record_payment(payment_callback: PaymentCallback):
+    """Record the payment outcome for accounting (sync handler, runs in a thread)"""
+    recent_events["accounting"].append(
+        (payment_callback.order_no, payment_callback.amount, payment_callback.status)
+    )
+
+
+async def notify_customer(payment_callback: PaymentCallback):
+    """Queue a payment notification for the customer"""
+    recent_events["notifications"].append((payment_callback.order_no, payment_callback.status))
+
+
+callback_dispatcher.subscribe(dispatch_ride, name="dispatch")
+callback_dispatcher.subscribe(record_payment, name="accounting", timeout=5.0)
+callback_dispatcher.subscribe(notify_customer, name="notifications")
+
+# Payment callback from YagoutPay: raw ASGI handler, no form parsing overhead
+app.add_route(
+    "/callback",
+    CallbackApp(yagoutpay, on_verified=callback_dispatcher.publish),
+    methods=["POST"],
+)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Admission control and callback dispatch counters"""
+    return {**admission.snapshot(), "callbacks": callback_dispatcher.stats()}
 
 
 @app.get("/health")
@@ -9,19 +9,34 @@ __author__ = "YagoutPay Team"
 __email__ = "support@yagoutpay.com"
 
 from .client import YagoutPay
+from .cache import CustomerProfileCache
+from .asgi import CallbackApp
+from .orders import OrderIndex, OrderLookup
+from .pending import PendingPaymentTracker
+from .events import CallbackDispatcher
 from .models import (
     PaymentRequest,
     PaymentResponse,
     CustomerDetails,
     TransactionDetails,
     BillingDetails,
+    PaymentStatus,
+    PaymentCallback,
 )
 
 __all__ = [
     "YagoutPay",
+    "CustomerProfileCache",
+    "CallbackApp",
+    "OrderIndex",
+    "OrderLookup",
+    "PendingPaymentTracker",
+    "CallbackDispatcher",
     "PaymentRequest",
     "PaymentResponse",
     "CustomerDetails",
     "TransactionDetails",
     "BillingDetails",
+    "PaymentStatus",
+    "PaymentCallback",
 ]
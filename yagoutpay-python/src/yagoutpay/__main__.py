@@ -0,0 +1,10 @@
+"""
+Entry point for ``python -m yagoutpay``
+"""
+
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+ASGI callback endpoint for YagoutPay SDK
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.formparsers import MultiPartException
+from starlette.requests import Request
+
+from .client import YagoutPay
+from .models import PaymentCallback
+
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+CALLBACK_FIELDS = frozenset(["order_no", "amount", "status", "hash", "merchant_request"])
+URLENCODED = b"application/x-www-form-urlencoded"
+MULTIPART = b"multipart/form-data"
+
+logger = logging.getLogger(__name__)
+
+
+class _ClientDisconnected(Exception):
+    """The client went away before sending the whole body"""
+
+
+class CallbackApp:
+    """Minimal ASGI app that verifies YagoutPay callbacks
+
+    Reads the raw request body up to ``max_body_size`` bytes, parses
+    ``application/x-www-form-urlencoded`` with the standard library and hands
+    the callback fields to ``YagoutPay.verify_callback``, which runs in a
+    worker thread so the decryption does not block the event loop.
+    ``multipart/form-data`` bodies are passed to Starlette's form parser
+    instead; other content types are rejected with 415. It can be mounted as a
+    plain route in FastAPI or Starlette::
+
+        app.add_route("/callback", CallbackApp(yagoutpay), methods=["POST"])
+    """
+
+    def __init__(
+        self,
+        client: YagoutPay,
+        success_url: str = "/success",
+        failure_url: str = "/failure",
+        max_body_size: int = 16384,
+        on_verified: Optional[Callable[[PaymentCallback], Any]] = None,
+    ):
+        """
+        Initialize callback app
+
+        Args:
+            client: YagoutPay client used to verify callbacks
+            success_url: Redirect target for verified successful payments
+            failure_url: Redirect target for failed or invalid callbacks
+            max_body_size: Maximum accepted request body size in bytes
+            on_verified: Optional hook called with each verified PaymentCallback
+        """
+        self.client = client
+        self.success_url = success_url
+        self.failure_url = failure_url
+        self.max_body_size = max_body_size
+        self.on_verified = on_verified
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] != "POST":
+            await self._send_status(send, 405, [(b"allow", b"POST")])
+            return
+
+        content_type = b""
+        content_length = None
+        for name, value in scope.get("headers", []):
+            if name == b"content-type":
+                content_type = value
+            elif name == b"content-length":
+                content_length = value
+
+        media_type = content_type.split(b";", 1)[0].strip().lower()
+        if media_type not in (URLENCODED, MULTIPART):
+            await self._send_status(send, 415)
+            return
+
+        if content_length is not None:
+            try:
+                if int(content_length) > self.max_body_size:
+                    await self._send_status(send, 413)
+                    return
+            except ValueError:
+                await self._send_status(send, 400)
+                return
+
+        try:
+            body = await self._read_body(receive)
+        except _ClientDisconnected:
+            # Nobody is left to answer, and a truncated body must not be verified
+            return
+        if body is None:
+            await self._send_status(send, 413)
+            return
+
+        if media_type == MULTIPART:
+            try:
+                fields = await self._parse_multipart(scope, body)
+            except (MultiPartException, HTTPException):
+                await self._send_status(send, 400)
+                return
+        else:
+            fields = self.parse_body(body)
+
+        payment_callback = await run_in_threadpool(self.client.verify_callback, fields)
+
+        if payment_callback is None:
+            location = f"{self.failure_url}?{urlencode({'reason': 'invalid_callback'})}"
+        else:
+            if self.on_verified is not None:
+                try:
+                    self.on_verified(payment_callback)
+                except Exception:
+                    # The callback is verified; a failing hook must not turn it into a 500
+                    logger.exception("on_verified hook failed for order %s", payment_callback.order_no)
+            if payment_callback.status.upper() == "SUCCESS":
+                query = {"order_no": payment_callback.order_no, "amount": payment_callback.amount}
+                location = f"{self.success_url}?{urlencode(query)}"
+            else:
+                query = {"order_no": payment_callback.order_no, "reason": payment_callback.status}
+                location = f"{self.failure_url}?{urlencode(query)}"
+
+        await self._send_status(send, 302, [(b"location", location.encode("latin-1"))])
+
+    async def _read_body(self, receive: Receive) -> Optional[bytes]:
+        """
+        Read the request body, enforcing the size cap
+
+        Returns:
+            Body bytes, or None if the body exceeds ``max_body_size``
+
+        Raises:
+            _ClientDisconnected: If the client disconnects before the body is complete
+        """
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise _ClientDisconnected()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    def parse_body(body: bytes) -> Dict[str, str]:
+        """
+        Parse an urlencoded body into the fields verify_callback needs
+
+        Args:
+            body: Raw request body
+
+        Returns:
+            Dictionary of callback fields (first value wins)
+        """
+        fields: Dict[str, str] = {}
+        for key, value in parse_qsl(body.decode("utf-8", "replace"), keep_blank_values=True):
+            if key in CALLBACK_FIELDS and key not in fields:
+                fields[key] = value
+        return fields
+
+    @staticmethod
+    async def _parse_multipart(scope: Scope, body: bytes) -> Dict[str, str]:
+        """
+        Parse a multipart body that has already been read
+
+        Args:
+            scope: ASGI scope carrying the multipart boundary
+            body: Raw request body
+
+        Returns:
+            Dictionary of callback fields (first value wins, file parts ignored)
+        """
+        async def replay() -> Dict[str, Any]:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        form = await Request(scope, replay).form()
+        try:
+            fields: Dict[str, str] = {}
+            for key, value in form.multi_items():
+                if key in CALLBACK_FIELDS and key not in fields and isinstance(value, str):
+                    fields[key] = value
+            return fields
+        finally:
+            await form.close()
+
+    @staticmethod
+    async def _send_status(send: Send, status: int, headers: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-length", b"0")] + (headers or []),
+        })
+        await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,134 @@
+"""
+Customer profile cache for YagoutPay SDK
+"""
+
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Optional, Tuple
+
+from .crypto import YagoutPayCrypto
+from .models import BillingDetails, CustomerDetails
+
+
+class CustomerProfileCache:
+    """Bounded LRU cache of serialized customer and billing sections
+
+    Entries are keyed by ``CustomerDetails.unique_id`` alone; a hit is a
+    dictionary lookup and does not compare the profile's fields. Invalidation
+    is up to the caller: once a customer is cached, later payments for the
+    same ``unique_id`` reuse the cached sections, even if they pass different
+    customer or billing details, until ``invalidate`` or ``clear`` is called.
+    """
+
+    _cust_values = attrgetter(*YagoutPayCrypto.CUST_FIELDS)
+    _bill_values = attrgetter(*YagoutPayCrypto.BILL_FIELDS)
+    _EMPTY_BILL = "|" * (len(YagoutPayCrypto.BILL_FIELDS) - 1)
+
+    def __init__(self, max_size: int = 10000):
+        """
+        Initialize customer profile cache
+
+        Args:
+            max_size: Maximum number of customer profiles to keep
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0")
+
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def serialize(cls, customer: CustomerDetails, billing: Optional[BillingDetails]) -> Tuple[str, str]:
+        """
+        Serialize customer and billing details into section strings
+
+        Fields are taken in ``YagoutPayCrypto.CUST_FIELDS`` and
+        ``BILL_FIELDS`` order, with missing values sent empty.
+
+        Args:
+            customer: Customer details
+            billing: Optional billing details
+
+        Returns:
+            Tuple of (cust_str, bill_str)
+        """
+        cust_str = "|".join([value or "" for value in cls._cust_values(customer)])
+        if billing is None:
+            bill_str = cls._EMPTY_BILL
+        else:
+            bill_str = "|".join([value or "" for value in cls._bill_values(billing)])
+        return cust_str, bill_str
+
+    def get_sections(self, customer: CustomerDetails, billing: Optional[BillingDetails]) -> Tuple[str, str]:
+        """
+        Get serialized sections for a customer, building them on a miss
+
+        Customers without a ``unique_id`` are serialized but never cached.
+
+        Args:
+            customer: Customer details
+            billing: Optional billing details
+
+        Returns:
+            Tuple of (cust_str, bill_str)
+        """
+        unique_id = customer.unique_id
+        if not unique_id:
+            return self.serialize(customer, billing)
+
+        with self._lock:
+            sections = self._entries.get(unique_id)
+            if sections is not None:
+                self._entries.move_to_end(unique_id)
+                self.hits += 1
+                return sections
+            self.misses += 1
+
+        sections = self.serialize(customer, billing)
+        self.put(unique_id, *sections)
+        return sections
+
+    def put(self, unique_id: str, cust_str: str, bill_str: str) -> None:
+        """
+        Store serialized sections for a customer
+
+        Args:
+            unique_id: Unique customer identifier
+            cust_str: Pipe-delimited customer section
+            bill_str: Pipe-delimited billing section
+        """
+        with self._lock:
+            self._entries[unique_id] = (cust_str, bill_str)
+            self._entries.move_to_end(unique_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, unique_id: str) -> bool:
+        """
+        Drop the cached profile for a customer
+
+        Call this whenever a customer's details or billing address change.
+
+        Args:
+            unique_id: Unique customer identifier
+
+        Returns:
+            True if an entry was removed, False otherwise
+        """
+        with self._lock:
+            return self._entries.pop(unique_id, None) is not None
+
+    def clear(self) -> None:
+        """Drop all cached profiles"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, unique_id: object) -> bool:
+        return unique_id in self._entries
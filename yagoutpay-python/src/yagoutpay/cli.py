@@ -0,0 +1,293 @@
+"""
+Command line interface for YagoutPay SDK
+
+Usage:
+    python -m yagoutpay generate orders.csv -o payments.jsonl
+    python -m yagoutpay generate orders.jsonl --html -o pages/
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from .client import YagoutPay
+from .models import BillingDetails, CustomerDetails, PaymentRequest, TransactionDetails
+
+
+class InvalidRow(ValueError):
+    """An input line that could not be parsed into a row"""
+
+
+Row = Tuple[int, Union[Dict[str, Any], InvalidRow]]
+
+TRANSACTION_FIELDS = frozenset(TransactionDetails.model_fields)
+CUSTOMER_FIELDS = frozenset(CustomerDetails.model_fields)
+BILLING_FIELDS = frozenset(BillingDetails.model_fields)
+
+# Per-process client, created once by the worker initializer
+_worker_client: Optional[YagoutPay] = None
+
+
+def read_rows(path: str) -> Iterator[Row]:
+    """
+    Stream order rows from a CSV or JSONL file
+
+    Args:
+        path: Input file path ('-' for JSONL on stdin)
+
+    Yields:
+        Tuples of (line number, row dict); unparsable JSONL lines yield an
+        InvalidRow instead of a dict so they are reported like any other bad row
+    """
+    if path == "-":
+        yield from _read_jsonl(sys.stdin)
+        return
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                # Empty CSV cells fall back to model defaults
+                yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}
+        else:
+            yield from _read_jsonl(f)
+
+
+def _read_jsonl(f) -> Iterator[Row]:
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, InvalidRow(f"invalid JSON: {exc.msg} at column {exc.colno}")
+
+
+def build_payment_request(row: Dict[str, Any]) -> PaymentRequest:
+    """
+    Build a payment request from a flat order row
+
+    Columns are matched by field name against TransactionDetails,
+    CustomerDetails and BillingDetails; billing is included when any
+    ``bill_*`` column is present.
+
+    Args:
+        row: Order row
+
+    Returns:
+        Validated PaymentRequest
+    """
+    billing = {k: v for k, v in row.items() if k in BILLING_FIELDS}
+    return PaymentRequest(
+        transaction=TransactionDetails(**{k: v for k, v in row.items() if k in TRANSACTION_FIELDS}),
+        customer=CustomerDetails(**{k: v for k, v in row.items() if k in CUSTOMER_FIELDS}),
+        billing=BillingDetails(**billing) if billing else None,
+    )
+
+
+def _init_worker(merchant_id: str, encryption_key: str, environment: str) -> None:
+    global _worker_client
+    _worker_client = YagoutPay(merchant_id, encryption_key, environment)
+
+
+def _process_chunk(chunk: List[Row], html: bool) -> List[Dict[str, Any]]:
+    """Validate and encrypt a chunk of rows inside a worker process"""
+    results = []
+    for line_no, row in chunk:
+        if isinstance(row, InvalidRow):
+            results.append({"line": line_no, "order_no": None, "error": str(row)})
+            continue
+        if not isinstance(row, dict):
+            results.append({
+                "line": line_no,
+                "order_no": None,
+                "error": f"expected a JSON object, got {type(row).__name__}",
+            })
+            continue
+        try:
+            payment_request = build_payment_request(row)
+            if html:
+                output = _worker_client.create_payment_form(payment_request)
+            else:
+                output = _worker_client.create_payment(payment_request).model_dump()
+            results.append({
+                "line": line_no,
+                "order_no": payment_request.transaction.order_no,
+                "output": output,
+            })
+        except ValidationError as exc:
+            message = "; ".join(
+                f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors()
+            )
+            results.append({"line": line_no, "order_no": row.get("order_no"), "error": message})
+        except Exception as exc:
+            # Any other bad row is reported, never allowed to end the run
+            results.append({"line": line_no, "order_no": row.get("order_no"), "error": str(exc)})
+    return results
+
+
+def _chunks(rows: Iterator[Row], size: int) -> Iterator[List[Row]]:
+    chunk: List[Row] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _safe_filename(order_no: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", order_no) or "order"
+
+
+class _Progress:
+    """Throughput readout on stderr"""
+
+    def __init__(self, enabled: bool, interval: float = 1.0):
+        self.enabled = enabled
+        self.interval = interval
+        self.start = self.last = time.perf_counter()
+        self.done = 0
+        self.errors = 0
+
+    def update(self, done: int, errors: int) -> None:
+        self.done += done
+        self.errors += errors
+        now = time.perf_counter()
+        if self.enabled and now - self.last >= self.interval:
+            self.last = now
+            self._print(now, end="\r")
+
+    def finish(self) -> None:
+        if self.enabled:
+            self._print(time.perf_counter(), end="\n")
+
+    def _print(self, now: float, end: str) -> None:
+        elapsed = max(now - self.start, 1e-9)
+        print(
+            f"{self.done} rows, {self.errors} errors, {self.done / elapsed:.0f} rows/s",
+            end=end, file=sys.stderr, flush=True,
+        )
+
+
+def generate(args: argparse.Namespace) -> int:
+    """Run the generate command"""
+    merchant_id = args.merchant_id or os.getenv("MERCHANT_ID")
+    encryption_key = args.encryption_key or os.getenv("ENCRYPTION_KEY")
+    if not merchant_id or not encryption_key:
+        print("error: MERCHANT_ID and ENCRYPTION_KEY are required", file=sys.stderr)
+        return 2
+
+    # Fail fast on a bad key instead of in every worker
+    YagoutPay(merchant_id, encryption_key, args.environment)
+
+    if args.html:
+        os.makedirs(args.output, exist_ok=True)
+        out = None
+    else:
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    progress = _Progress(enabled=not args.quiet)
+    max_in_flight = args.workers * 2
+    pending: Deque[Any] = deque()
+
+    def drain_one() -> None:
+        results = pending.popleft().result()
+        errors = 0
+        for result in results:
+            if "error" in result:
+                errors += 1
+                print(json.dumps(result), file=sys.stderr)
+            elif args.html:
+                filename = f"{_safe_filename(result['order_no'])}.html"
+                try:
+                    # Exclusive create: a duplicate order never overwrites an earlier page
+                    f = open(os.path.join(args.output, filename), "x", encoding="utf-8")
+                except FileExistsError:
+                    errors += 1
+                    print(json.dumps({
+                        "line": result["line"],
+                        "order_no": result["order_no"],
+                        "error": f"duplicate page {filename} (file already exists)",
+                    }), file=sys.stderr)
+                    continue
+                with f:
+                    f.write(result["output"])
+            else:
+                out.write(json.dumps({"order_no": result["order_no"], **result["output"]}))
+                out.write("\n")
+        progress.update(len(results), errors)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(merchant_id, encryption_key, args.environment),
+        ) as executor:
+            # Only a bounded number of chunks is ever held in memory
+            for chunk in _chunks(read_rows(args.input), args.chunk_size):
+                pending.append(executor.submit(_process_chunk, chunk, args.html))
+                if len(pending) >= max_in_flight:
+                    drain_one()
+            while pending:
+                drain_one()
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+        progress.finish()
+
+    return 1 if progress.errors else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    CLI entry point
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="python -m yagoutpay", description="YagoutPay SDK tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gen = subparsers.add_parser(
+        "generate",
+        help="Generate encrypted payment payloads for a list of orders",
+        description=(
+            "Stream orders from a CSV or JSONL file (columns named after the "
+            "TransactionDetails, CustomerDetails and BillingDetails fields) and "
+            "write one PaymentResponse per line, or one HTML redirect page per order. "
+            "Invalid rows are reported as JSON on stderr."
+        ),
+    )
+    gen.add_argument("input", help="Input .csv or .jsonl file ('-' for JSONL on stdin)")
+    gen.add_argument("-o", "--output", default="-", help="Output JSONL file, or directory with --html (default: stdout)")
+    gen.add_argument("--html", action="store_true", help="Write one HTML redirect page per order (existing pages are not overwritten)")
+    gen.add_argument("--merchant-id", help="Merchant ID (default: $MERCHANT_ID)")
+    gen.add_argument("--encryption-key", help="Encryption key (default: $ENCRYPTION_KEY)")
+    gen.add_argument("--environment", default=os.getenv("ENVIRONMENT", "test"), help="'test' or 'production'")
+    gen.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    gen.add_argument("--chunk-size", type=int, default=500, help="Rows per worker task")
+    gen.add_argument("-q", "--quiet", action="store_true", help="Disable progress output")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        if args.html and args.output == "-":
+            parser.error("--html requires --output DIRECTORY")
+        if args.workers < 1 or args.chunk_size < 1:
+            parser.error("--workers and --chunk-size must be at least 1")
+        return generate(args)
+    return 2
@@ -2,9 +2,28 @@
 Main YagoutPay client for Python SDK
 """
 
-from typing import Dict, Any, Optional
-from .models import PaymentRequest, PaymentResponse, PaymentCallback
+import asyncio
+import json
+import logging
+from typing import Dict, Any, AsyncIterator, Iterable, Optional, Tuple
+from .models import PaymentRequest, PaymentResponse, PaymentCallback, PaymentStatus
 from .crypto import YagoutPayCrypto
+from .cache import CustomerProfileCache
+from .orders import OrderLookup
+from .pending import PendingPaymentTracker
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+logger = logging.getLogger(__name__)
 
 
 class YagoutPay:
@@ -14,7 +33,21 @@ class YagoutPay:
     TEST_POST_URL = "https://uatcheckout.yagoutpay.com/ms-transaction-core-1-0/paymentRedirection/checksumGatewayPage"
     PROD_POST_URL = "https://checkout.yagoutpay.com/ms-transaction-core-1-0/paymentRedirection/checksumGatewayPage"
     
-    def __init__(self, merchant_id: str, encryption_key: str, environment: str = "test"):
+    # Status inquiry layout (provisional, see build_status_query)
+    STATUS_REQUEST_FORMAT = "{merchant_id}|{order_no}"
+    STATUS_HASH_FORMAT = "{merchant_id}~{order_no}"
+    MAX_STATUS_RESPONSE_SIZE = 65536
+    
+    def __init__(
+        self,
+        merchant_id: str,
+        encryption_key: str,
+        environment: str = "test",
+        customer_cache: Optional[CustomerProfileCache] = None,
+        order_index: Optional[OrderLookup] = None,
+        pending_tracker: Optional[PendingPaymentTracker] = None,
+        status_url: Optional[str] = None,
+    ):
         """
         Initialize YagoutPay client
         
@@ -22,10 +55,23 @@ class YagoutPay:
             merchant_id: Your merchant ID
             encryption_key: Your 32-character encryption key
             environment: 'test' or 'production'
+            customer_cache: Optional cache of serialized customer/billing
+                sections for returning customers (keyed by unique_id)
+            order_index: Optional index of issued order numbers (an OrderIndex
+                or any OrderLookup); callbacks it does not admit are rejected
+                before any decryption
+            pending_tracker: Optional tracker that expires orders whose
+                callback never arrives (per process; see PendingPaymentTracker)
+            status_url: Gateway order status inquiry URL, required for
+                query_status/query_statuses
         """
         self.merchant_id = merchant_id
         self.encryption_key = encryption_key
         self.environment = environment.lower()
+        self.customer_cache = customer_cache
+        self.order_index = order_index
+        self.pending_tracker = pending_tracker
+        self.status_url = status_url
         
         # Initialize crypto utilities
         self.crypto = YagoutPayCrypto(encryption_key)
@@ -57,6 +103,55 @@ class YagoutPay:
             "channel": payment_request.transaction.channel,
         }
         
+        if self.customer_cache is not None:
+            # Returning customers reuse their pre-serialized cust/bill sections
+            cust_str, bill_str = self.customer_cache.get_sections(
+                payment_request.customer, payment_request.billing
+            )
+            encrypted_request = self.crypto.build_encrypted_request_from_sections(
+                self.merchant_id, txn_details, cust_str, bill_str
+            )
+        else:
+            encrypted_request = self.crypto.build_encrypted_request(
+                self._build_request_data(payment_request, txn_details)
+            )
+        
+        if self.order_index is not None:
+            self._record_order(payment_request.transaction.order_no)
+        if self.pending_tracker is not None:
+            self.pending_tracker.track(payment_request.transaction.order_no)
+        
+        # Build hash data
+        hash_data = {
+            "merchantId": self.merchant_id,
+            "merchantKey": self.encryption_key,
+            "order_no": payment_request.transaction.order_no,
+            "amount": str(payment_request.transaction.amount),
+            "currencyFrom": payment_request.transaction.country,
+            "currencyTo": payment_request.transaction.currency,
+        }
+        
+        # Generate hash
+        encrypted_hash = self.crypto.build_encrypted_hash(hash_data)
+        
+        return PaymentResponse(
+            me_id=encrypted_request["me_id"],
+            merchant_request=encrypted_request["merchant_request"],
+            hash=encrypted_hash["hash"],
+            post_url=self.post_url,
+        )
+    
+    def _build_request_data(self, payment_request: PaymentRequest, txn_details: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the full request data dictionary for encryption
+        
+        Args:
+            payment_request: PaymentRequest object
+            txn_details: Prepared transaction details
+            
+        Returns:
+            Request data with all sections
+        """
         # Prepare customer details
         cust_details = {
             "cust_name": payment_request.customer.cust_name,
@@ -78,7 +173,7 @@ class YagoutPay:
             }
         
         # Build request data with all sections (matching JavaScript SDK)
-        request_data = {
+        return {
             "merchantId": self.merchant_id,
             "merchantKey": self.encryption_key,
             "txnDetails": txn_details,
@@ -91,27 +186,32 @@ class YagoutPay:
             "upiDetails": {},  # Empty UPI details
             "otherDetails": {},  # Empty other details
         }
+    
+    def create_payment_json(self, payment_request: PaymentRequest) -> bytes:
+        """
+        Create a payment request and serialize the response as JSON
         
-        # Build hash data
-        hash_data = {
-            "merchantId": self.merchant_id,
-            "merchantKey": self.encryption_key,
-            "order_no": payment_request.transaction.order_no,
-            "amount": str(payment_request.transaction.amount),
-            "currencyFrom": payment_request.transaction.country,
-            "currencyTo": payment_request.transaction.currency,
-        }
+        For mobile and SPA clients that post to the gateway themselves. Uses
+        orjson when installed, falling back to the standard json module.
         
-        # Encrypt request and generate hash
-        encrypted_request = self.crypto.build_encrypted_request(request_data)
-        encrypted_hash = self.crypto.build_encrypted_hash(hash_data)
+        Args:
+            payment_request: PaymentRequest object
+            
+        Returns:
+            UTF-8 encoded JSON object with me_id, merchant_request, hash and post_url
+        """
+        payment_response = self.create_payment(payment_request)
         
-        return PaymentResponse(
-            me_id=encrypted_request["me_id"],
-            merchant_request=encrypted_request["merchant_request"],
-            hash=encrypted_hash["hash"],
-            post_url=self.post_url,
-        )
+        data = {
+            "me_id": payment_response.me_id,
+            "merchant_request": payment_response.merchant_request,
+            "hash": payment_response.hash,
+            "post_url": payment_response.post_url,
+        }
+        
+        if orjson is not None:
+            return orjson.dumps(data)
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
     
     def create_payment_form(self, payment_request: PaymentRequest, form_id: str = "paymentForm") -> str:
         """
@@ -219,6 +319,10 @@ class YagoutPay:
             if not all([order_no, amount, status, hash_value, merchant_request]):
                 return None
             
+            # Reject callbacks for orders we never issued before any crypto
+            if self.order_index is not None and not self._order_admitted(order_no):
+                return None
+            
             # Verify hash
             response_data = {
                 "order_no": order_no,
@@ -237,6 +341,9 @@ class YagoutPay:
                 # If decryption fails, we can still proceed with basic verification
                 pass
             
+            if self.pending_tracker is not None:
+                self.pending_tracker.resolve(order_no)
+            
             return PaymentCallback(
                 order_no=order_no,
                 amount=amount,
@@ -248,6 +355,249 @@ class YagoutPay:
         except Exception:
             return None
     
+    def _record_order(self, order_no: str) -> None:
+        """Add an issued order to the order index, logging if it errors"""
+        try:
+            self.order_index.add(order_no)
+        except Exception:
+            # Index trouble must not fail a payment that is otherwise valid
+            logger.exception("Order index add failed for %s", order_no)
+    
+    def _order_admitted(self, order_no: str) -> bool:
+        """Ask the order index about a callback, failing open if it errors"""
+        try:
+            return self.order_index.admits(order_no)
+        except Exception:
+            # A broken index must not drop genuine callbacks; verify them instead
+            logger.exception("Order index lookup failed for %s; verifying callback anyway", order_no)
+            return True
+    
+    def build_status_query(self, order_no: str) -> Dict[str, str]:
+        """
+        Build the encrypted form fields for an order status query
+        
+        Provisional: the gateway's status inquiry format is not published.
+        The plaintexts follow the payment request conventions and are taken
+        from ``STATUS_REQUEST_FORMAT`` and ``STATUS_HASH_FORMAT``; override
+        them (or this method) in a subclass if YagoutPay specifies a
+        different layout for your merchant account.
+        
+        Args:
+            order_no: Order number to query
+            
+        Returns:
+            Dictionary with me_id, merchant_request and hash
+        """
+        fields = {"merchant_id": self.merchant_id, "order_no": order_no}
+        return {
+            "me_id": self.merchant_id,
+            "merchant_request": self.crypto.aes_encrypt_base64(self.STATUS_REQUEST_FORMAT.format(**fields)),
+            "hash": self.crypto.aes_encrypt_base64(
+                self.crypto.sha256_hex(self.STATUS_HASH_FORMAT.format(**fields))
+            ),
+        }
+    
+    def parse_status_response(self, order_no: str, response_data: Dict[str, Any]) -> PaymentStatus:
+        """
+        Decrypt and verify a status query response
+        
+        Provisional, like ``build_status_query``: the decrypted
+        ``merchant_response`` is assumed to be pipe-delimited as
+        status|order_no|amount|txn_id|bank_ref_no|response_code|response_message
+        (the layout used by the PHP SDK). When a ``hash`` is present it is
+        verified like a callback hash.
+        
+        Args:
+            order_no: Order number that was queried
+            response_data: Parsed JSON response from the gateway
+            
+        Returns:
+            PaymentStatus object
+            
+        Raises:
+            ValueError: If the response is malformed, fails verification or
+                belongs to a different order
+        """
+        merchant_response = response_data.get("merchant_response")
+        if not merchant_response:
+            raise ValueError("Status response has no merchant_response")
+        
+        try:
+            decrypted = self.crypto.aes_decrypt_base64(merchant_response)
+        except Exception as exc:
+            raise ValueError("Failed to decrypt status response") from exc
+        
+        parts = decrypted.split("|")
+        parts += [""] * (7 - len(parts))
+        status, response_order_no, amount, txn_id, bank_ref_no, response_code, response_message = parts[:7]
+        
+        if response_order_no != order_no:
+            raise ValueError(f"Status response is for order {response_order_no!r}, expected {order_no!r}")
+        
+        hash_value = response_data.get("hash")
+        if hash_value and not self.crypto.verify_response_hash(
+            {"order_no": order_no, "amount": amount, "status": status}, hash_value
+        ):
+            raise ValueError("Status response hash verification failed")
+        
+        return PaymentStatus(
+            order_no=order_no,
+            status=status,
+            amount=amount,
+            txn_id=txn_id or None,
+            bank_ref_no=bank_ref_no or None,
+            response_code=response_code or None,
+            response_message=response_message or None,
+        )
+    
+    async def query_status(
+        self, order_no: str, http_client: Optional["httpx.AsyncClient"] = None, timeout: float = 10.0
+    ) -> PaymentStatus:
+        """
+        Query the gateway for the status of a single order
+        
+        Requires the optional ``httpx`` dependency (``pip install yagoutpay-python[http]``).
+        
+        Args:
+            order_no: Order number to query
+            http_client: Optional httpx.AsyncClient to reuse connections
+            timeout: Timeout in seconds for the whole request
+            
+        Returns:
+            PaymentStatus object
+            
+        Raises:
+            ValueError: If status_url is not configured, or the response is
+                too large, malformed or fails verification
+            RuntimeError: If the gateway returns a non-2xx status
+            ImportError: If httpx is not installed
+            httpx.HTTPError: On connection failures
+            asyncio.TimeoutError: If the request times out
+        """
+        if not self.status_url:
+            raise ValueError("status_url must be configured for status queries")
+        if httpx is None:
+            raise ImportError("Status queries require httpx: pip install yagoutpay-python[http]")
+        
+        if http_client is None:
+            async with httpx.AsyncClient() as own_client:
+                return await self.query_status(order_no, own_client, timeout)
+        
+        status, body = await asyncio.wait_for(
+            self._post_status_query(http_client, order_no, timeout), timeout
+        )
+        if not 200 <= status < 300:
+            raise RuntimeError(f"Status query failed with HTTP {status}")
+        
+        try:
+            response_data = json.loads(body)
+        except ValueError as exc:
+            raise ValueError("Status response is not valid JSON") from exc
+        return self.parse_status_response(order_no, response_data)
+    
+    async def _post_status_query(
+        self, http_client: "httpx.AsyncClient", order_no: str, timeout: float
+    ) -> Tuple[int, bytes]:
+        """POST a status query and read the body, capped at MAX_STATUS_RESPONSE_SIZE"""
+        async with http_client.stream(
+            "POST", self.status_url, data=self.build_status_query(order_no), timeout=timeout
+        ) as response:
+            declared = response.headers.get("content-length")
+            if declared is not None and declared.isdigit() and int(declared) > self.MAX_STATUS_RESPONSE_SIZE:
+                raise ValueError("Status response too large")
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.MAX_STATUS_RESPONSE_SIZE:
+                    raise ValueError("Status response too large")
+                chunks.append(chunk)
+            return response.status_code, b"".join(chunks)
+    
+    async def query_statuses(
+        self,
+        order_nos: Iterable[str],
+        concurrency: int = 20,
+        timeout: float = 10.0,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[PaymentStatus]:
+        """
+        Query the status of many orders concurrently
+        
+        At most ``concurrency`` queries are in flight, sharing one
+        httpx.AsyncClient whose pool is limited to ``concurrency``
+        keep-alive connections to the gateway. Results are yielded as they
+        complete, not in input order. Failed queries yield a PaymentStatus
+        with ``error`` set, and once ``deadline`` seconds have passed the
+        remaining orders are yielded with ``error="deadline exceeded"``
+        without being queried.
+        
+        Args:
+            order_nos: Order numbers to query (may be a lazy iterable)
+            concurrency: Maximum number of queries in flight
+            timeout: Per-request timeout in seconds
+            deadline: Optional overall deadline in seconds
+            
+        Yields:
+            PaymentStatus objects as queries complete
+        """
+        loop = asyncio.get_running_loop()
+        end = None if deadline is None else loop.time() + deadline
+        semaphore = asyncio.Semaphore(concurrency)
+        results: "asyncio.Queue[Optional[PaymentStatus]]" = asyncio.Queue()
+        tasks = set()
+        
+        async def run_one(http_client: "httpx.AsyncClient", order_no: str) -> None:
+            try:
+                remaining = None if end is None else end - loop.time()
+                result = await asyncio.wait_for(self.query_status(order_no, http_client, timeout), remaining)
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                expired = end is not None and loop.time() >= end
+                result = PaymentStatus(order_no=order_no, error="deadline exceeded" if expired else "timed out")
+            except Exception as exc:
+                result = PaymentStatus(order_no=order_no, error=str(exc) or type(exc).__name__)
+            finally:
+                semaphore.release()
+            results.put_nowait(result)
+        
+        async def produce(http_client: "httpx.AsyncClient") -> None:
+            try:
+                for order_no in order_nos:
+                    await semaphore.acquire()
+                    if end is not None and loop.time() >= end:
+                        semaphore.release()
+                        results.put_nowait(PaymentStatus(order_no=order_no, error="deadline exceeded"))
+                        continue
+                    task = asyncio.ensure_future(run_one(http_client, order_no))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks)
+            finally:
+                results.put_nowait(None)
+        
+        if not self.status_url:
+            raise ValueError("status_url must be configured for status queries")
+        if httpx is None:
+            raise ImportError("Status queries require httpx: pip install yagoutpay-python[http]")
+        
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits) as http_client:
+            producer = asyncio.ensure_future(produce(http_client))
+            try:
+                while True:
+                    result = await results.get()
+                    if result is None:
+                        break
+                    yield result
+                await producer
+            finally:
+                # Consumer stopped early: cancel outstanding queries
+                producer.cancel()
+                for task in list(tasks):
+                    task.cancel()
+                await asyncio.gather(producer, *tasks, return_exceptions=True)
+    
     def generate_order_number(self, prefix: str = "ORDER") -> str:
         """
         Generate a unique order number
@@ -13,6 +13,28 @@ from cryptography.hazmat.primitives import padding
 class YagoutPayCrypto:
     """Cryptography utilities for YagoutPay integration"""
     
+    # Section field order as documented by YagoutPay
+    TXN_FIELDS = [
+        'ag_id', 'me_id', 'order_no', 'amount', 'country', 'currency',
+        'txn_type', 'success_url', 'failure_url', 'channel'
+    ]
+    PG_FIELDS = ['pg_id', 'paymode', 'scheme', 'wallet_type']
+    CARD_FIELDS = ['card_no', 'exp_month', 'exp_year', 'cvv', 'card_name']
+    CUST_FIELDS = ['cust_name', 'email_id', 'mobile_no', 'unique_id', 'is_logged_in']
+    BILL_FIELDS = ['bill_address', 'bill_city', 'bill_state', 'bill_country', 'bill_zip']
+    SHIP_FIELDS = ['ship_address', 'ship_city', 'ship_state', 'ship_country', 'ship_zip', 'ship_days', 'address_count']
+    ITEM_FIELDS = ['item_count', 'item_value', 'item_category']
+    UPI_FIELDS: list = []
+    OTHER_FIELDS = ['udf_1', 'udf_2', 'udf_3', 'udf_4', 'udf_5']
+    
+    # Serialized form of sections the SDK always sends empty
+    _EMPTY_PG = "|" * (len(PG_FIELDS) - 1)
+    _EMPTY_CARD = "|" * (len(CARD_FIELDS) - 1)
+    _EMPTY_SHIP = "|" * (len(SHIP_FIELDS) - 1)
+    _EMPTY_ITEM = "|" * (len(ITEM_FIELDS) - 1)
+    _EMPTY_UPI = ""
+    _EMPTY_OTHER = "|" * (len(OTHER_FIELDS) - 1)
+    
     def __init__(self, encryption_key: str):
         """
         Initialize with encryption key
@@ -144,18 +166,15 @@ class YagoutPayCrypto:
         other_details = request_data.get("otherDetails", {})
         
         # Build section strings in documented order
-        txn_str = self.stringify_section(txn_details, [
-            'ag_id', 'me_id', 'order_no', 'amount', 'country', 'currency', 
-            'txn_type', 'success_url', 'failure_url', 'channel'
-        ])
-        pg_str = self.stringify_section(pg_details, ['pg_id', 'paymode', 'scheme', 'wallet_type'])
-        card_str = self.stringify_section(card_details, ['card_no', 'exp_month', 'exp_year', 'cvv', 'card_name'])
-        cust_str = self.stringify_section(cust_details, ['cust_name', 'email_id', 'mobile_no', 'unique_id', 'is_logged_in'])
-        bill_str = self.stringify_section(bill_details, ['bill_address', 'bill_city', 'bill_state', 'bill_country', 'bill_zip'])
-        ship_str = self.stringify_section(ship_details, ['ship_address', 'ship_city', 'ship_state', 'ship_country', 'ship_zip', 'ship_days', 'address_count'])
-        item_str = self.stringify_section(item_details, ['item_count', 'item_value', 'item_category'])
-        upi_str = self.stringify_section(upi_details, [])  # Empty section placeholder
-        other_str = self.stringify_section(other_details, ['udf_1', 'udf_2', 'udf_3', 'udf_4', 'udf_5'])
+        txn_str = self.stringify_section(txn_details, self.TXN_FIELDS)
+        pg_str = self.stringify_section(pg_details, self.PG_FIELDS)
+        card_str = self.stringify_section(card_details, self.CARD_FIELDS)
+        cust_str = self.stringify_section(cust_details, self.CUST_FIELDS)
+        bill_str = self.stringify_section(bill_details, self.BILL_FIELDS)
+        ship_str = self.stringify_section(ship_details, self.SHIP_FIELDS)
+        item_str = self.stringify_section(item_details, self.ITEM_FIELDS)
+        upi_str = self.stringify_section(upi_details, self.UPI_FIELDS)  # Empty section placeholder
+        other_str = self.stringify_section(other_details, self.OTHER_FIELDS)
         
         # Join sections with ~
         full_message = "~".join([
@@ -170,6 +189,35 @@ class YagoutPayCrypto:
             "merchant_request": encrypted_data
         }
     
+    def build_encrypted_request_from_sections(
+        self, merchant_id: str, txn_details: Dict[str, Any], cust_str: str, bill_str: str
+    ) -> Dict[str, str]:
+        """
+        Build encrypted request from pre-serialized customer and billing sections
+        
+        Only the transaction section is stringified here; all other sections
+        are sent empty, exactly as ``build_encrypted_request`` does for them.
+        
+        Args:
+            merchant_id: Merchant ID
+            txn_details: Dictionary containing transaction details
+            cust_str: Pipe-delimited customer section
+            bill_str: Pipe-delimited billing section
+            
+        Returns:
+            Dictionary with me_id and merchant_request
+        """
+        txn_str = self.stringify_section(txn_details, self.TXN_FIELDS)
+        full_message = "~".join([
+            txn_str, self._EMPTY_PG, self._EMPTY_CARD, cust_str, bill_str,
+            self._EMPTY_SHIP, self._EMPTY_ITEM, self._EMPTY_UPI, self._EMPTY_OTHER
+        ])
+        
+        return {
+            "me_id": merchant_id,
+            "merchant_request": self.aes_encrypt_base64(full_message)
+        }
+    
     def build_encrypted_hash(self, hash_data: Dict[str, Any]) -> Dict[str, str]:
         """
         Build encrypted hash for YagoutPay
@@ -0,0 +1,315 @@
+"""
+Verified-callback event dispatch for YagoutPay SDK
+"""
+
+import asyncio
+import inspect
+import logging
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .models import PaymentCallback
+
+
+Handler = Callable[[PaymentCallback], Any]
+FailureHook = Callable[[str, PaymentCallback, Exception], None]
+
+logger = logging.getLogger(__name__)
+
+
+class _Subscription:
+    __slots__ = ("name", "handler", "is_async", "timeout", "max_retries", "stats")
+
+    def __init__(self, name: str, handler: Handler, timeout: float, max_retries: int):
+        self.name = name
+        self.handler = handler
+        self.is_async = inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(
+            getattr(handler, "__call__", None)
+        )
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.stats: Counter = Counter()
+
+
+class CallbackDispatcher:
+    """Fan verified callbacks out to several subscribers without blocking
+
+    ``publish`` only enqueues: each subscriber gets its own FIFO per
+    ``order_no`` and a worker task drains it, so events for one order reach a
+    subscriber in publish order while different orders and different
+    subscribers are delivered concurrently. At most ``max_concurrency``
+    handler calls run at once across all subscribers.
+
+    A handler call that raises or exceeds its timeout is retried with
+    exponential backoff. While a delivery waits for its retry, later events
+    for the same order and subscriber stay queued behind it; other orders
+    are not held up. After ``max_retries`` retries the event is dropped for
+    that subscriber and ``on_failure`` is called; an exception from the hook
+    is logged and counted as ``hook_errors`` in ``stats``.
+
+    Async handlers run on the event loop. Sync handlers run in a thread pool
+    of ``max_concurrency`` workers; a timed-out sync call cannot be
+    interrupted and finishes in the background.
+
+    ``publish`` matches the ``CallbackApp`` hook::
+
+        dispatcher = CallbackDispatcher()
+        dispatcher.subscribe(dispatch_ride)
+        dispatcher.subscribe(record_payment, timeout=2.0)
+        app.add_route("/callback", CallbackApp(yagoutpay, on_verified=dispatcher.publish))
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_pending: int = 100000,
+        on_failure: Optional[FailureHook] = None,
+    ):
+        """
+        Initialize dispatcher
+
+        Args:
+            max_concurrency: Maximum handler calls in flight at once
+            timeout: Default per-call timeout in seconds for subscribers
+            max_retries: Default number of retries after a failed call
+            retry_backoff: Delay before the first retry in seconds (doubles per retry)
+            max_backoff: Upper bound on the retry delay in seconds
+            max_pending: Maximum undelivered events across all subscribers;
+                publishing beyond it drops the event and counts it
+            on_failure: Optional hook called with (subscriber name, callback,
+                last error) when an event is given up on
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.max_pending = max_pending
+        self.on_failure = on_failure
+
+        self._subscriptions: List[_Subscription] = []
+        self._queues: Dict[Tuple[int, str], Deque[PaymentCallback]] = {}
+        self._tasks: set = set()
+        self._pending = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+        self.metrics: Counter = Counter()
+
+    def subscribe(
+        self,
+        handler: Handler,
+        name: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+    ) -> str:
+        """
+        Register a sync or async handler for verified callbacks
+
+        Args:
+            handler: Callable taking a PaymentCallback
+            name: Optional subscriber name (defaults to the handler's name)
+            timeout: Optional per-call timeout in seconds
+            max_retries: Optional number of retries after a failed call
+
+        Returns:
+            Subscriber name
+        """
+        name = name or getattr(handler, "__name__", None) or type(handler).__name__
+        if any(subscription.name == name for subscription in self._subscriptions):
+            raise ValueError(f"Subscriber already registered: {name}")
+        self._subscriptions.append(_Subscription(
+            name,
+            handler,
+            self.timeout if timeout is None else timeout,
+            self.max_retries if max_retries is None else max_retries,
+        ))
+        return name
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Bind the dispatcher to an event loop
+
+        Called implicitly by the first ``publish`` on a running loop; call it
+        explicitly to publish from other threads before that.
+
+        Args:
+            loop: Event loop (defaults to the running loop)
+        """
+        if self._loop is not None:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+
+    def publish(self, payment_callback: PaymentCallback) -> bool:
+        """
+        Queue a verified callback for every subscriber
+
+        Returns immediately; delivery happens in background tasks. Safe to
+        call from other threads once the dispatcher is bound to a loop.
+
+        Args:
+            payment_callback: Verified callback from ``verify_callback``
+
+        Returns:
+            False if the event was dropped because the dispatcher is closed
+            or ``max_pending`` was reached, True otherwise (from another
+            thread the ``max_pending`` check happens later on the loop)
+        """
+        if self._closed:
+            self.metrics["dropped"] += 1
+            return False
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if self._loop is None:
+            if running is None:
+                raise RuntimeError("CallbackDispatcher is not bound to an event loop; call start() first")
+            self.start(running)
+
+        if running is not self._loop:
+            self._loop.call_soon_threadsafe(self._enqueue, payment_callback)
+            return True
+        return self._enqueue(payment_callback)
+
+    def _enqueue(self, payment_callback: PaymentCallback) -> bool:
+        # Runs on the dispatcher's loop, where its primitives must be created
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._idle = asyncio.Event()
+            self._idle.set()
+
+        subscriptions = self._subscriptions
+        if self._pending + len(subscriptions) > self.max_pending:
+            self.metrics["dropped"] += 1
+            return False
+
+        self.metrics["published"] += 1
+        for index, subscription in enumerate(subscriptions):
+            key = (index, payment_callback.order_no)
+            queue = self._queues.get(key)
+            self._pending += 1
+            if queue is not None:
+                # A worker is already draining this order for this subscriber
+                queue.append(payment_callback)
+                continue
+            self._queues[key] = deque([payment_callback])
+            task = self._loop.create_task(self._drain(key, subscription))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if self._pending:
+            self._idle.clear()
+        return True
+
+    async def _drain(self, key: Tuple[int, str], subscription: _Subscription) -> None:
+        queue = self._queues[key]
+        try:
+            while queue:
+                await self._deliver(subscription, queue[0])
+                queue.popleft()
+                self._pending -= 1
+        finally:
+            # On cancellation the remaining events are abandoned
+            self._pending -= len(queue)
+            del self._queues[key]
+            if not self._pending:
+                self._idle.set()
+
+    async def _deliver(self, subscription: _Subscription, payment_callback: PaymentCallback) -> None:
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                try:
+                    await asyncio.wait_for(self._call(subscription, payment_callback), subscription.timeout)
+                except Exception as exc:
+                    error = exc
+                else:
+                    subscription.stats["delivered"] += 1
+                    return
+
+            kind = "timeouts" if isinstance(error, asyncio.TimeoutError) else "errors"
+            subscription.stats[kind] += 1
+            if attempt >= subscription.max_retries:
+                subscription.stats["failed"] += 1
+                if self.on_failure is not None:
+                    try:
+                        self.on_failure(subscription.name, payment_callback, error)
+                    except Exception:
+                        # Must not escape _drain and abandon the order's queued events
+                        self.metrics["hook_errors"] += 1
+                        logger.exception(
+                            "on_failure hook failed for %s, order %s",
+                            subscription.name, payment_callback.order_no,
+                        )
+                return
+
+            # Back off outside the semaphore so other deliveries keep running
+            subscription.stats["retries"] += 1
+            await asyncio.sleep(min(self.retry_backoff * (2 ** attempt), self.max_backoff))
+            attempt += 1
+
+    def _call(self, subscription: _Subscription, payment_callback: PaymentCallback):
+        if subscription.is_async:
+            return subscription.handler(payment_callback)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="yagoutpay-events"
+            )
+        return self._loop.run_in_executor(self._executor, subscription.handler, payment_callback)
+
+    async def join(self) -> None:
+        """Wait until every queued event has been delivered or given up on"""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop accepting events and wait for queued deliveries
+
+        Args:
+            timeout: Optional seconds to wait before cancelling outstanding deliveries
+        """
+        self._closed = True
+        if self._idle is not None:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except asyncio.TimeoutError:
+                for task in list(self._tasks):
+                    task.cancel()
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @property
+    def pending(self) -> int:
+        """Events queued or in delivery, counted once per subscriber"""
+        return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Dispatcher and per-subscriber counters
+
+        Returns:
+            Dictionary with totals, pending count and counters per subscriber
+        """
+        return {
+            "pending": self._pending,
+            "counters": dict(self.metrics),
+            "subscribers": {
+                subscription.name: dict(subscription.stats) for subscription in self._subscriptions
+            },
+        }
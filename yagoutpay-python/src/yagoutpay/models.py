@@ -134,3 +134,30 @@ class PaymentCallback(BaseModel):
                 "merchant_request": "encrypted_response_data"
             }
         }
+
+
+class PaymentStatus(BaseModel):
+    """Order status returned by a gateway status query"""
+    
+    order_no: str = Field(..., description="Order number")
+    status: Optional[str] = Field(None, description="Payment status")
+    amount: Optional[str] = Field(None, description="Payment amount")
+    txn_id: Optional[str] = Field(None, description="Gateway transaction ID")
+    bank_ref_no: Optional[str] = Field(None, description="Bank reference number")
+    response_code: Optional[str] = Field(None, description="Gateway response code")
+    response_message: Optional[str] = Field(None, description="Gateway response message")
+    error: Optional[str] = Field(None, description="Query error, if the status could not be retrieved")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "order_no": "ORDER_123456",
+                "status": "SUCCESS",
+                "amount": "1000.00",
+                "txn_id": "TXN123456789",
+                "bank_ref_no": "BANKREF123",
+                "response_code": "00",
+                "response_message": "Transaction successful",
+                "error": None
+            }
+        }
@@ -0,0 +1,346 @@
+"""
+Issued-order membership index for YagoutPay SDK
+"""
+
+import hashlib
+import logging
+import math
+import struct
+import threading
+import time
+from typing import BinaryIO, Dict, Optional, Protocol, Set, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over order numbers"""
+
+    def __init__(self, capacity: int, fp_rate: float = 0.001):
+        """
+        Initialize Bloom filter sized for the given capacity and false-positive rate
+
+        Args:
+            capacity: Expected number of order numbers
+            fp_rate: Target false-positive rate at capacity (0 < fp_rate < 1)
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+
+        num_bits = int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_bits = max(num_bits, 8)
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    @staticmethod
+    def hash_pair(order_no: str) -> Tuple[int, int]:
+        """Hash an order number into the two base hashes used for double hashing"""
+        digest = hashlib.blake2b(order_no.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, order_no: str) -> None:
+        """Add an order number"""
+        h1, h2 = self.hash_pair(order_no)
+        bits = self.bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % num_bits
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def contains_hashed(self, h1: int, h2: int) -> bool:
+        """Membership test from a precomputed ``hash_pair``"""
+        bits = self.bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % num_bits
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __contains__(self, order_no: str) -> bool:
+        return self.contains_hashed(*self.hash_pair(order_no))
+
+    @classmethod
+    def from_state(cls, num_bits: int, num_hashes: int, count: int, bits: bytes) -> "BloomFilter":
+        """Rebuild a Bloom filter from serialized state"""
+        bloom = cls.__new__(cls)
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.count = count
+        bloom.bits = bytearray(bits)
+        return bloom
+
+
+Partition = Union[BloomFilter, Set[str]]
+
+
+class OrderLookup(Protocol):
+    """Store of issued order numbers accepted as ``YagoutPay(order_index=...)``
+
+    ``OrderIndex`` keeps its state in process memory. Deployments with
+    several workers or replicas can plug in a store shared by all of them
+    (a Redis set with a TTL, a database table) by implementing these two
+    methods. ``admits`` returns False only when the callback should be
+    rejected; if it raises, the callback is verified as if no index was
+    configured.
+    """
+
+    def add(self, order_no: str) -> None:
+        ...
+
+    def admits(self, order_no: str) -> bool:
+        ...
+
+
+def _read_exact(fp: BinaryIO, size: int) -> bytes:
+    data = fp.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated order index file")
+    return data
+
+
+class OrderIndex:
+    """Time-partitioned index of issued order numbers
+
+    ``create_payment`` adds each order number to the current partition and
+    ``verify_callback`` rejects callbacks whose order number is in none of the
+    retained partitions before doing any crypto. Partitions are Bloom filters,
+    so a lookup may report a never-issued order as known with probability
+    at most about ``fp_rate`` (the callback is then fully verified as before), but an
+    issued order is never reported unknown while its partition is retained.
+    The false-positive rate only holds up to ``capacity_per_partition`` orders
+    per partition; partitions that grow past it are counted in ``overfilled``
+    and logged once, and the rate rises from then on.
+
+    ``exact=True`` swaps the Bloom filters for plain sets: no false positives,
+    at the cost of storing every order number. It is a different storage mode,
+    not a second check, so Bloom positives are never confirmed against a set.
+
+    Orders older than ``partition_seconds * max_partitions`` are forgotten, so
+    callbacks for them are rejected.
+
+    The index only knows the orders issued by this process (plus any loaded
+    with ``load``). With several uvicorn workers or replicas, a callback
+    landing on a process that did not issue the order would be rejected as
+    unknown, and so would orders issued after the last ``dump`` when a
+    process restarts. In those deployments either plug in a shared store
+    (see ``OrderLookup``) or pass ``fail_open=True``: unknown orders are then
+    counted in ``unknown`` and logged but still fully verified.
+    """
+
+    MAGIC = b"YPOI"
+    VERSION = 2
+
+    def __init__(
+        self,
+        capacity_per_partition: int = 1000000,
+        fp_rate: float = 0.001,
+        partition_seconds: int = 86400,
+        max_partitions: int = 7,
+        exact: bool = False,
+        fail_open: bool = False,
+    ):
+        """
+        Initialize order index
+
+        Args:
+            capacity_per_partition: Expected order numbers per partition
+            fp_rate: Target false-positive rate of a lookup across all partitions
+            partition_seconds: Time span covered by each partition
+            max_partitions: Number of partitions retained
+            exact: Store order numbers in sets instead of Bloom filters
+            fail_open: Admit callbacks for unknown orders (counted in ``unknown``)
+                instead of rejecting them; use when the index is not shared by
+                every process that issues orders
+        """
+        if partition_seconds <= 0:
+            raise ValueError("partition_seconds must be greater than 0")
+        if max_partitions <= 0:
+            raise ValueError("max_partitions must be greater than 0")
+
+        self.capacity_per_partition = capacity_per_partition
+        self.fp_rate = fp_rate
+        self.partition_seconds = partition_seconds
+        self.max_partitions = max_partitions
+        self.exact = exact
+        self.fail_open = fail_open
+        self.unknown = 0
+        self.overfilled = 0
+        self._partitions: Dict[int, Partition] = {}
+        self._lock = threading.Lock()
+
+    def _partition_id(self, now: Optional[float] = None) -> int:
+        return int((time.time() if now is None else now) // self.partition_seconds)
+
+    def _new_partition(self) -> Partition:
+        if self.exact:
+            return set()
+        # Lookups probe every partition, so split the false-positive budget
+        return BloomFilter(self.capacity_per_partition, self.fp_rate / self.max_partitions)
+
+    def add(self, order_no: str, now: Optional[float] = None) -> None:
+        """
+        Record an issued order number
+
+        Args:
+            order_no: Order number
+            now: Optional timestamp (defaults to current time)
+        """
+        partition_id = self._partition_id(now)
+        with self._lock:
+            partition = self._partitions.get(partition_id)
+            if partition is None:
+                partition = self._partitions[partition_id] = self._new_partition()
+                oldest = partition_id - self.max_partitions
+                for stale in [p for p in self._partitions if p <= oldest]:
+                    del self._partitions[stale]
+            partition.add(order_no)
+            if not self.exact and partition.count == self.capacity_per_partition + 1:
+                self.overfilled += 1
+                logger.warning(
+                    "Order index partition %d exceeded its capacity of %d orders; "
+                    "false-positive rate is now above %s",
+                    partition_id, self.capacity_per_partition, self.fp_rate,
+                )
+
+    def contains(self, order_no: str, now: Optional[float] = None) -> bool:
+        """
+        Check whether an order number may have been issued
+
+        Args:
+            order_no: Order number
+            now: Optional timestamp (defaults to current time)
+
+        Returns:
+            False if the order was definitely not issued within the retention window
+        """
+        oldest = self._partition_id(now) - self.max_partitions
+        partitions = [p for pid, p in list(self._partitions.items()) if pid > oldest]
+        if self.exact:
+            return any(order_no in p for p in partitions)
+
+        # Hash once and probe every retained partition with the same pair
+        h1, h2 = BloomFilter.hash_pair(order_no)
+        return any(p.contains_hashed(h1, h2) for p in partitions)
+
+    def admits(self, order_no: str) -> bool:
+        """
+        Decide whether a callback for this order should be verified
+
+        Args:
+            order_no: Order number
+
+        Returns:
+            True if the order may have been issued, or if it is unknown and
+            the index fails open; False if the callback should be rejected
+        """
+        if self.contains(order_no):
+            return True
+        self.unknown += 1
+        if self.fail_open:
+            logger.warning("Callback for unknown order %s admitted (fail_open)", order_no)
+            return True
+        return False
+
+    def __contains__(self, order_no: str) -> bool:
+        return self.contains(order_no)
+
+    def __len__(self) -> int:
+        return sum(
+            len(p) if isinstance(p, set) else p.count for p in self._partitions.values()
+        )
+
+    def dump(self, fp: BinaryIO) -> None:
+        """
+        Serialize the index to a binary file object
+
+        Args:
+            fp: File object opened for binary writing
+        """
+        with self._lock:
+            partitions = list(self._partitions.items())
+            fp.write(self.MAGIC)
+            fp.write(struct.pack(
+                "<BBIdqI", self.VERSION, int(self.exact), self.max_partitions,
+                self.fp_rate, self.partition_seconds, len(partitions),
+            ))
+            fp.write(struct.pack("<Q", self.capacity_per_partition))
+            for partition_id, partition in partitions:
+                if isinstance(partition, set):
+                    # Length-prefixed so order numbers may contain any character
+                    data = b"".join(
+                        struct.pack("<I", len(encoded)) + encoded
+                        for encoded in (order_no.encode("utf-8") for order_no in partition)
+                    )
+                    fp.write(struct.pack("<qQIQQ", partition_id, 0, 0, len(partition), len(data)))
+                else:
+                    data = bytes(partition.bits)
+                    fp.write(struct.pack(
+                        "<qQIQQ", partition_id, partition.num_bits,
+                        partition.num_hashes, partition.count, len(data),
+                    ))
+                fp.write(data)
+
+    @classmethod
+    def load(cls, fp: BinaryIO) -> "OrderIndex":
+        """
+        Load an index written by ``dump``
+
+        Args:
+            fp: File object opened for binary reading
+
+        Returns:
+            OrderIndex instance
+
+        Raises:
+            ValueError: If the file is not an order index or is truncated or corrupt
+        """
+        if fp.read(4) != cls.MAGIC:
+            raise ValueError("Not a YagoutPay order index file")
+
+        header = struct.Struct("<BBIdqI")
+        version, exact, max_partitions, fp_rate, partition_seconds, count = header.unpack(
+            _read_exact(fp, header.size)
+        )
+        if version not in (1, cls.VERSION):
+            raise ValueError(f"Unsupported order index version: {version}")
+        (capacity,) = struct.unpack("<Q", _read_exact(fp, 8))
+
+        index = cls(capacity, fp_rate, partition_seconds, max_partitions, bool(exact))
+        entry = struct.Struct("<qQIQQ")
+        for _ in range(count):
+            partition_id, num_bits, num_hashes, added, size = entry.unpack(_read_exact(fp, entry.size))
+            data = _read_exact(fp, size)
+            if exact:
+                index._partitions[partition_id] = cls._decode_orders(data, version)
+            else:
+                if num_bits == 0 or num_hashes == 0 or size != (num_bits + 7) // 8:
+                    raise ValueError("Corrupt order index partition")
+                index._partitions[partition_id] = BloomFilter.from_state(
+                    num_bits, num_hashes, added, data
+                )
+        return index
+
+    @staticmethod
+    def _decode_orders(data: bytes, version: int) -> Set[str]:
+        if version == 1:
+            # Version 1 joined order numbers with newlines
+            return set(data.decode("utf-8").split("\n")) if data else set()
+
+        orders = set()
+        offset = 0
+        while offset < len(data):
+            if offset + 4 > len(data):
+                raise ValueError("Corrupt order index partition")
+            (length,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            if offset + length > len(data):
+                raise ValueError("Corrupt order index partition")
+            orders.add(data[offset:offset + length].decode("utf-8"))
+            offset += length
+        return orders
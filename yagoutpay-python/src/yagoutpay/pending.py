@@ -0,0 +1,241 @@
+"""
+Pending-payment expiry tracking for YagoutPay SDK
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+ExpiryHook = Callable[[str], None]
+ResolveHook = Callable[[str], None]
+
+logger = logging.getLogger(__name__)
+
+
+class PendingPaymentTracker:
+    """Track orders awaiting a callback and expire abandoned ones
+
+    Orders are scheduled on a hierarchical timing wheel: ``levels`` wheels of
+    ``wheel_size`` slots, where a slot on level ``k`` spans ``wheel_size ** k``
+    ticks. ``track``, ``resolve`` and expiry are O(1); a slot on a higher
+    level is cascaded down once when the lower wheel wraps. Resolved orders
+    are removed from the deadline map only and skipped lazily when their
+    slot comes up, so no slot is ever scanned for removal.
+
+    ``advance`` must be called periodically (or run ``run`` as a background
+    task) to fire expiry hooks.
+
+    The tracker lives in process memory and only knows the orders tracked by
+    its own process. With several uvicorn workers or replicas, the callback
+    for an order may reach a process that did not issue it, so the issuing
+    process never resolves the order and expires it even though it was paid.
+    In those deployments pass ``on_unknown``: ``resolve`` calls it with every
+    order number it is not tracking, so it can be published to the other
+    processes (for example over Redis pub/sub), and each subscriber calls
+    ``resolve(order_no, forward=False)`` on its own tracker.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 900.0,
+        tick: float = 1.0,
+        wheel_size: int = 64,
+        levels: int = 4,
+        on_expire: Optional[ExpiryHook] = None,
+        on_unknown: Optional[ResolveHook] = None,
+    ):
+        """
+        Initialize tracker
+
+        Args:
+            timeout: Seconds before a pending order expires
+            tick: Timing wheel resolution in seconds
+            wheel_size: Slots per wheel level (power of two)
+            levels: Number of wheel levels
+            on_expire: Optional hook called with each expired order number
+            on_unknown: Optional hook called with order numbers passed to
+                ``resolve`` that this tracker is not tracking, to forward them
+                to the process that is
+        """
+        if tick <= 0 or timeout <= 0:
+            raise ValueError("timeout and tick must be greater than 0")
+        if wheel_size < 2 or wheel_size & (wheel_size - 1):
+            raise ValueError("wheel_size must be a power of two")
+
+        self.timeout = timeout
+        self.tick = tick
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self._bits = wheel_size.bit_length() - 1
+        self._mask = wheel_size - 1
+        self._wheels: List[List[List[str]]] = [
+            [[] for _ in range(wheel_size)] for _ in range(levels)
+        ]
+        self._deadlines: Dict[str, int] = {}
+        self._current = self._tick_at(time.time())
+        self._hooks: List[ExpiryHook] = [on_expire] if on_expire else []
+        self.on_unknown = on_unknown
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.resolved = 0
+        self.unknown = 0
+        self.hook_errors = 0
+
+    def _tick_at(self, now: float) -> int:
+        return int(now / self.tick)
+
+    def add_expiry_hook(self, hook: ExpiryHook) -> None:
+        """
+        Register a hook called with each expired order number
+
+        Args:
+            hook: Callable taking the order number
+        """
+        self._hooks.append(hook)
+
+    def _schedule(self, order_no: str, deadline: int) -> None:
+        # Caller holds the lock; a deadline equal to the current tick lands in
+        # the level 0 slot that advance() is about to process
+        delta = deadline - self._current
+        level = 0
+        while level < self.levels - 1 and delta >= 1 << (self._bits * (level + 1)):
+            level += 1
+        if level == self.levels - 1:
+            # Beyond the wheel's range: park in the farthest slot, re-cascaded later
+            deadline = min(deadline, self._current + (1 << (self._bits * self.levels)) - 1)
+        slot = (deadline >> (self._bits * level)) & self._mask
+        self._wheels[level][slot].append(order_no)
+
+    def track(self, order_no: str, timeout: Optional[float] = None, now: Optional[float] = None) -> None:
+        """
+        Start tracking a pending order
+
+        Tracking an order again replaces its deadline.
+
+        Args:
+            order_no: Order number
+            timeout: Optional timeout in seconds (defaults to the tracker timeout)
+            now: Optional timestamp (defaults to current time)
+        """
+        now = time.time() if now is None else now
+        deadline = self._tick_at(now + (self.timeout if timeout is None else timeout))
+        with self._lock:
+            self._deadlines[order_no] = deadline
+            # The current tick's slot has already fired
+            self._schedule(order_no, max(deadline, self._current + 1))
+
+    def resolve(self, order_no: str, forward: bool = True) -> bool:
+        """
+        Stop tracking an order whose callback arrived
+
+        An order this tracker is not tracking is counted in ``unknown`` and,
+        if ``forward`` is set, passed to the ``on_unknown`` hook.
+
+        Args:
+            order_no: Order number
+            forward: Call ``on_unknown`` for an untracked order; pass False
+                when resolving an order forwarded by another process
+
+        Returns:
+            True if the order was pending, False otherwise
+        """
+        with self._lock:
+            if self._deadlines.pop(order_no, None) is not None:
+                self.resolved += 1
+                return True
+            self.unknown += 1
+
+        if forward and self.on_unknown is not None:
+            try:
+                self.on_unknown(order_no)
+            except Exception:
+                # Called from verify_callback; the callback itself is still valid
+                self.hook_errors += 1
+                logger.exception("on_unknown hook failed for order %s", order_no)
+        return False
+
+    def advance(self, now: Optional[float] = None) -> List[str]:
+        """
+        Advance the wheel to ``now`` and fire hooks for expired orders
+
+        A hook that raises is logged and counted in ``hook_errors``; every
+        hook is still called for every expired order.
+
+        Args:
+            now: Optional timestamp (defaults to current time)
+
+        Returns:
+            List of expired order numbers
+        """
+        target = self._tick_at(time.time() if now is None else now)
+        expired: List[str] = []
+        with self._lock:
+            if not self._deadlines:
+                # Nothing pending: jump ahead and drop stale slot entries
+                if target > self._current:
+                    self._current = target
+                    for wheel in self._wheels:
+                        for slot in wheel:
+                            slot.clear()
+                return expired
+
+            bits, mask, deadlines = self._bits, self._mask, self._deadlines
+            while self._current < target:
+                self._current += 1
+                current = self._current
+
+                # Cascade higher levels whose lower wheels just wrapped
+                level = 1
+                while level < self.levels and not (current >> (bits * (level - 1))) & mask:
+                    slot_index = (current >> (bits * level)) & mask
+                    entries = self._wheels[level][slot_index]
+                    self._wheels[level][slot_index] = []
+                    for order_no in entries:
+                        deadline = deadlines.get(order_no)
+                        if deadline is not None:
+                            self._schedule(order_no, deadline)
+                    level += 1
+
+                slot_index = current & mask
+                entries = self._wheels[0][slot_index]
+                if not entries:
+                    continue
+                self._wheels[0][slot_index] = []
+                for order_no in entries:
+                    deadline = deadlines.get(order_no)
+                    if deadline is None:
+                        continue
+                    if deadline <= current:
+                        del deadlines[order_no]
+                        expired.append(order_no)
+                    else:
+                        # Re-tracked with a later deadline
+                        self._schedule(order_no, deadline)
+
+            self.expired += len(expired)
+
+        for order_no in expired:
+            for hook in self._hooks:
+                try:
+                    hook(order_no)
+                except Exception:
+                    # The order is already out of the wheel; other hooks and
+                    # orders must still run, and run() must keep ticking
+                    self.hook_errors += 1
+                    logger.exception("Expiry hook %r failed for order %s", hook, order_no)
+        return expired
+
+    async def run(self) -> None:
+        """Advance the wheel every tick until cancelled"""
+        while True:
+            await asyncio.sleep(self.tick)
+            self.advance()
+
+    def __contains__(self, order_no: object) -> bool:
+        return order_no in self._deadlines
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
@@ -0,0 +1,30 @@
+import base64
+from urllib.parse import urlencode
+
+import pytest
+
+from yagoutpay import YagoutPay
+
+MERCHANT_ID = "202508080001"
+ENCRYPTION_KEY = base64.b64encode(b"k" * 32).decode()
+
+
+@pytest.fixture
+def client():
+    return YagoutPay(MERCHANT_ID, ENCRYPTION_KEY)
+
+
+def signed_callback(client, order_no="RIDE_1", amount="250.0", status="SUCCESS"):
+    """Callback fields signed the way the gateway signs them"""
+    crypto = client.crypto
+    return {
+        "order_no": order_no,
+        "amount": amount,
+        "status": status,
+        "hash": crypto.aes_encrypt_base64(crypto.sha256_hex(f"{order_no}{amount}{status}")),
+        "merchant_request": crypto.aes_encrypt_base64(f"{order_no}|{amount}|{status}"),
+    }
+
+
+def callback_body(client, **kwargs) -> bytes:
+    return urlencode(signed_callback(client, **kwargs)).encode()
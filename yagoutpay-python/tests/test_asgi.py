@@ -0,0 +1,105 @@
+import pytest
+
+from yagoutpay import CallbackApp
+
+from conftest import callback_body, signed_callback
+
+
+async def call(app, messages, method="POST", content_type=b"application/x-www-form-urlencoded"):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/callback",
+        "headers": [(b"content-type", content_type)],
+    }
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+def location(sent):
+    return dict(sent[0]["headers"])[b"location"].decode()
+
+
+@pytest.mark.asyncio
+async def test_verified_callback_redirects_to_success(client):
+    verified = []
+    app = CallbackApp(client, on_verified=verified.append)
+    sent = await call(app, [{"type": "http.request", "body": callback_body(client)}])
+
+    assert sent[0]["status"] == 302
+    assert location(sent).startswith("/success?order_no=RIDE_1")
+    assert [c.order_no for c in verified] == ["RIDE_1"]
+
+
+@pytest.mark.asyncio
+async def test_multipart_callback_is_accepted(client):
+    boundary = "yagoutpay-boundary"
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'
+        for key, value in signed_callback(client).items()
+    ]
+    body = ("".join(parts) + f"--{boundary}--\r\n").encode()
+    content_type = f"multipart/form-data; boundary={boundary}".encode()
+    sent = await call(CallbackApp(client), [{"type": "http.request", "body": body}], content_type=content_type)
+
+    assert sent[0]["status"] == 302
+    assert location(sent).startswith("/success?order_no=RIDE_1")
+
+
+@pytest.mark.asyncio
+async def test_malformed_multipart_is_rejected(client):
+    content_type = b"multipart/form-data"
+    sent = await call(CallbackApp(client), [{"type": "http.request", "body": b"garbage"}], content_type=content_type)
+
+    assert sent[0]["status"] == 400
+
+
+@pytest.mark.asyncio
+async def test_tampered_callback_redirects_to_failure(client):
+    body = callback_body(client).replace(b"250.0", b"1.0")
+    sent = await call(CallbackApp(client), [{"type": "http.request", "body": body}])
+
+    assert location(sent) == "/failure?reason=invalid_callback"
+
+
+@pytest.mark.asyncio
+async def test_failing_hook_still_redirects(client, caplog):
+    def hook(payment_callback):
+        raise RuntimeError("consumer down")
+
+    sent = await call(CallbackApp(client, on_verified=hook), [{"type": "http.request", "body": callback_body(client)}])
+
+    assert sent[0]["status"] == 302
+    assert location(sent).startswith("/success?")
+    assert "on_verified hook failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_disconnect_mid_body_sends_nothing(client):
+    verified = []
+    body = callback_body(client)
+    messages = [
+        {"type": "http.request", "body": body[:20], "more_body": True},
+        {"type": "http.disconnect"},
+    ]
+    sent = await call(CallbackApp(client, on_verified=verified.append), messages)
+
+    assert sent == []
+    assert verified == []
+
+
+@pytest.mark.asyncio
+async def test_rejects_wrong_method_type_and_size(client):
+    assert (await call(CallbackApp(client), [], method="GET"))[0]["status"] == 405
+    assert (await call(CallbackApp(client), [], content_type=b"application/json"))[0]["status"] == 415
+
+    big = [{"type": "http.request", "body": b"x" * 100}]
+    assert (await call(CallbackApp(client, max_body_size=50), big))[0]["status"] == 413
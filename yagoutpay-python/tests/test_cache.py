@@ -0,0 +1,98 @@
+import pytest
+
+from yagoutpay import (
+    BillingDetails, CustomerDetails, CustomerProfileCache, PaymentRequest, TransactionDetails, YagoutPay,
+)
+
+from conftest import ENCRYPTION_KEY, MERCHANT_ID
+
+
+def customer(unique_id="CUST_1", name="Abebe Kebede"):
+    return CustomerDetails(
+        cust_name=name, email_id="abebe@example.com", mobile_no="0911234567", unique_id=unique_id,
+    )
+
+
+BILLING = BillingDetails(bill_address="Bole Road", bill_city="Addis Ababa", bill_country="Ethiopia")
+
+
+def payment(cust, billing=None, order_no="RIDE_1"):
+    return PaymentRequest(
+        transaction=TransactionDetails(
+            order_no=order_no, amount=250,
+            success_url="https://example.com/s", failure_url="https://example.com/f",
+        ),
+        customer=cust,
+        billing=billing,
+    )
+
+
+@pytest.mark.parametrize("unique_id", ["CUST_1", None])
+@pytest.mark.parametrize("billing", [BILLING, None])
+def test_cached_output_matches_uncached(client, unique_id, billing):
+    cached = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY, customer_cache=CustomerProfileCache())
+    request = payment(customer(unique_id), billing)
+
+    expected = client.create_payment(request)
+    assert cached.create_payment(request) == expected
+    # Second call is served from the cache when the customer has a unique_id
+    assert cached.create_payment(request) == expected
+
+
+def test_customers_without_unique_id_are_not_cached():
+    cache = CustomerProfileCache()
+    cache.get_sections(customer(None), None)
+
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_invalidate_rebuilds_changed_profile(client):
+    cache = CustomerProfileCache()
+    cached = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY, customer_cache=cache)
+    cached.create_payment(payment(customer(name="Old Name")))
+
+    renamed = payment(customer(name="New Name"))
+    # Without invalidation the cached sections are reused
+    assert cached.create_payment(renamed) != client.create_payment(renamed)
+
+    assert cache.invalidate("CUST_1")
+    assert not cache.invalidate("CUST_1")
+    assert cached.create_payment(renamed) == client.create_payment(renamed)
+
+
+def test_clear_drops_every_profile():
+    cache = CustomerProfileCache()
+    for n in range(3):
+        cache.get_sections(customer(f"CUST_{n}"), None)
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert "CUST_0" not in cache
+
+
+def test_least_recently_used_profile_is_evicted():
+    cache = CustomerProfileCache(max_size=2)
+    cache.get_sections(customer("A"), None)
+    cache.get_sections(customer("B"), None)
+    cache.get_sections(customer("A"), None)
+    cache.get_sections(customer("C"), None)
+
+    assert "A" in cache and "C" in cache
+    assert "B" not in cache
+    assert len(cache) == 2
+
+
+def test_hit_and_miss_counters():
+    cache = CustomerProfileCache()
+    for _ in range(3):
+        cache.get_sections(customer("A"), BILLING)
+    cache.get_sections(customer("B"), BILLING)
+
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_max_size_must_be_positive():
+    with pytest.raises(ValueError):
+        CustomerProfileCache(max_size=0)
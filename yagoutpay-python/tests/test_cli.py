@@ -0,0 +1,73 @@
+import json
+import os
+
+import pytest
+
+from yagoutpay.cli import main
+
+from conftest import ENCRYPTION_KEY, MERCHANT_ID
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("MERCHANT_ID", MERCHANT_ID)
+    monkeypatch.setenv("ENCRYPTION_KEY", ENCRYPTION_KEY)
+
+
+def order(order_no, amount=100):
+    return {
+        "order_no": order_no,
+        "amount": amount,
+        "success_url": "https://example.com/ok",
+        "failure_url": "https://example.com/fail",
+        "cust_name": "Abebe Kebede",
+        "email_id": "abebe@example.com",
+        "mobile_no": "0911234567",
+    }
+
+
+def run(capsys, *args):
+    code = main(["generate", *args, "-w", "1", "-q"])
+    captured = capsys.readouterr()
+    errors = [json.loads(line) for line in captured.err.splitlines() if line.startswith("{")]
+    return code, errors
+
+
+def test_jsonl_bad_lines_are_reported_and_run_continues(tmp_path, capsys):
+    source = tmp_path / "orders.jsonl"
+    source.write_text("\n".join([
+        json.dumps(order("A1")),
+        "{not json",
+        "[1, 2]",
+        json.dumps(order("A2")),
+    ]) + "\n")
+    output = tmp_path / "out.jsonl"
+
+    code, errors = run(capsys, str(source), "-o", str(output))
+
+    assert code == 1
+    assert [(e["line"], e["error"].split(":")[0]) for e in errors] == [
+        (2, "invalid JSON"),
+        (3, "expected a JSON object, got list"),
+    ]
+    written = [json.loads(line)["order_no"] for line in output.read_text().splitlines()]
+    assert written == ["A1", "A2"]
+
+
+def test_html_duplicate_order_numbers_are_errors(tmp_path, capsys):
+    fields = list(order("B1"))
+    rows = [order("B1"), order("B1", amount=200), order("B/2"), order("B_2")]
+    source = tmp_path / "orders.csv"
+    source.write_text(
+        ",".join(fields) + "\n"
+        + "\n".join(",".join(str(row[f]) for f in fields) for row in rows) + "\n"
+    )
+    pages = tmp_path / "pages"
+
+    code, errors = run(capsys, str(source), "--html", "-o", str(pages))
+
+    assert code == 1
+    assert sorted(os.listdir(pages)) == ["B1.html", "B_2.html"]
+    assert [(e["line"], e["order_no"]) for e in errors] == [(3, "B1"), (5, "B_2")]
+    assert "already exists" in errors[0]["error"]
+    assert "100" in (pages / "B1.html").read_text()
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from yagoutpay import CallbackDispatcher, PaymentCallback
+
+
+def event(order_no, status="SUCCESS"):
+    return PaymentCallback(order_no=order_no, amount="250.0", status=status, hash="h", merchant_request="m")
+
+
+@pytest.mark.asyncio
+async def test_events_reach_every_subscriber_in_order_per_order():
+    received = {"async": [], "sync": []}
+    lock = threading.Lock()
+
+    async def async_handler(payment_callback):
+        # Later events finish faster, so ordering is not an accident of timing
+        await asyncio.sleep(0.005 if payment_callback.status == "0" else 0)
+        received["async"].append((payment_callback.order_no, payment_callback.status))
+
+    def sync_handler(payment_callback):
+        with lock:
+            received["sync"].append((payment_callback.order_no, payment_callback.status))
+
+    dispatcher = CallbackDispatcher(max_concurrency=4)
+    dispatcher.subscribe(async_handler, name="async")
+    dispatcher.subscribe(sync_handler, name="sync")
+    for seq in range(5):
+        for order in range(10):
+            assert dispatcher.publish(event(f"o{order}", str(seq)))
+    await dispatcher.join()
+    await dispatcher.close()
+
+    for name, events in received.items():
+        assert len(events) == 50
+        for order in range(10):
+            statuses = [s for o, s in events if o == f"o{order}"]
+            assert statuses == ["0", "1", "2", "3", "4"], name
+    assert dispatcher.stats()["subscribers"]["async"]["delivered"] == 50
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    active = peak = 0
+
+    async def handler(payment_callback):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.005)
+        active -= 1
+
+    dispatcher = CallbackDispatcher(max_concurrency=3)
+    dispatcher.subscribe(handler)
+    for order in range(20):
+        dispatcher.publish(event(f"o{order}"))
+    await dispatcher.join()
+
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_publish_does_not_wait_for_handlers():
+    async def slow(payment_callback):
+        await asyncio.sleep(0.2)
+
+    dispatcher = CallbackDispatcher()
+    dispatcher.subscribe(slow)
+    start = time.perf_counter()
+    dispatcher.publish(event("o1"))
+
+    assert time.perf_counter() - start < 0.05
+    assert dispatcher.pending == 1
+    await dispatcher.close(timeout=0.01)
+    assert dispatcher.pending == 0
+    assert dispatcher.publish(event("o2")) is False
+
+
+@pytest.mark.asyncio
+async def test_failed_calls_are_retried_then_reported():
+    attempts = []
+    failures = []
+
+    async def flaky(payment_callback):
+        attempts.append(payment_callback.order_no)
+        if payment_callback.order_no == "dead" or attempts.count(payment_callback.order_no) < 2:
+            raise ConnectionError("down")
+
+    async def hangs(payment_callback):
+        await asyncio.sleep(1)
+
+    dispatcher = CallbackDispatcher(
+        max_retries=2, retry_backoff=0.001,
+        on_failure=lambda name, payment_callback, error: failures.append((name, payment_callback.order_no, type(error))),
+    )
+    dispatcher.subscribe(flaky)
+    dispatcher.subscribe(hangs, timeout=0.01, max_retries=0)
+    dispatcher.publish(event("ok"))
+    dispatcher.publish(event("dead"))
+    await dispatcher.join()
+
+    assert attempts.count("ok") == 2
+    assert attempts.count("dead") == 3
+    assert sorted(failures) == sorted([
+        ("flaky", "dead", ConnectionError),
+        ("hangs", "ok", asyncio.TimeoutError),
+        ("hangs", "dead", asyncio.TimeoutError),
+    ])
+    stats = dispatcher.stats()["subscribers"]
+    assert stats["flaky"] == {"delivered": 1, "errors": 4, "retries": 3, "failed": 1}
+    assert stats["hangs"] == {"timeouts": 2, "failed": 2}
+
+
+@pytest.mark.asyncio
+async def test_failing_failure_hook_keeps_later_events(caplog):
+    delivered = []
+
+    async def handler(payment_callback):
+        if payment_callback.status == "bad":
+            raise ValueError("rejected")
+        delivered.append(payment_callback.status)
+
+    def on_failure(name, payment_callback, error):
+        raise RuntimeError("alerting is down")
+
+    dispatcher = CallbackDispatcher(max_retries=0, on_failure=on_failure)
+    dispatcher.subscribe(handler)
+    dispatcher.publish(event("o1", "bad"))
+    dispatcher.publish(event("o1", "next"))
+    await dispatcher.join()
+
+    assert delivered == ["next"]
+    assert dispatcher.pending == 0
+    assert dispatcher.stats()["counters"]["hook_errors"] == 1
+    assert "on_failure hook failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_max_pending_drops_and_counts():
+    async def slow(payment_callback):
+        await asyncio.sleep(1)
+
+    dispatcher = CallbackDispatcher(max_pending=2)
+    dispatcher.subscribe(slow)
+    results = [dispatcher.publish(event(f"o{n}")) for n in range(4)]
+
+    assert results == [True, True, False, False]
+    assert dispatcher.stats()["counters"] == {"published": 2, "dropped": 2}
+    await dispatcher.close(timeout=0)
+
+
+@pytest.mark.asyncio
+async def test_publish_from_another_thread():
+    received = []
+
+    async def handler(payment_callback):
+        received.append(payment_callback.order_no)
+
+    dispatcher = CallbackDispatcher()
+    dispatcher.subscribe(handler)
+    dispatcher.start()
+    thread = threading.Thread(target=lambda: [dispatcher.publish(event(f"o{n}")) for n in range(5)])
+    thread.start()
+    thread.join()
+    await asyncio.sleep(0)
+    await dispatcher.join()
+
+    assert sorted(received) == [f"o{n}" for n in range(5)]
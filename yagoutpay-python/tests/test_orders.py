@@ -0,0 +1,120 @@
+import io
+
+import pytest
+
+from yagoutpay import CustomerDetails, OrderIndex, PaymentRequest, TransactionDetails, YagoutPay
+
+from conftest import ENCRYPTION_KEY, MERCHANT_ID, signed_callback
+
+NOW = 1_700_000_000.0
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_added_orders_are_known(exact):
+    index = OrderIndex(capacity_per_partition=1000, exact=exact)
+    index.add("RIDE_1", now=NOW)
+
+    assert index.contains("RIDE_1", now=NOW)
+    assert not index.contains("RIDE_2", now=NOW)
+
+
+def test_overfilled_partition_is_counted_once(caplog):
+    index = OrderIndex(capacity_per_partition=10)
+    for n in range(25):
+        index.add(f"RIDE_{n}", now=NOW)
+
+    assert index.overfilled == 1
+    assert caplog.text.count("exceeded its capacity") == 1
+
+
+def test_orders_expire_with_their_partition():
+    index = OrderIndex(capacity_per_partition=1000, partition_seconds=10, max_partitions=2)
+    index.add("RIDE_1", now=NOW)
+
+    assert index.contains("RIDE_1", now=NOW + 15)
+    assert not index.contains("RIDE_1", now=NOW + 25)
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_dump_load_round_trip(exact):
+    index = OrderIndex(capacity_per_partition=1000, exact=exact)
+    orders = ["RIDE_1", "A\nB", "with|pipe", "ünïcode", ""]
+    for order_no in orders:
+        index.add(order_no, now=NOW)
+
+    buffer = io.BytesIO()
+    index.dump(buffer)
+    loaded = OrderIndex.load(io.BytesIO(buffer.getvalue()))
+
+    assert all(loaded.contains(order_no, now=NOW) for order_no in orders)
+    if exact:
+        assert not loaded.contains("A", now=NOW)
+        assert not loaded.contains("B", now=NOW)
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_load_rejects_truncated_file(exact):
+    index = OrderIndex(capacity_per_partition=1000, exact=exact)
+    index.add("RIDE_1", now=NOW)
+    buffer = io.BytesIO()
+    index.dump(buffer)
+    data = buffer.getvalue()
+
+    for cut in (3, 10, len(data) - 1):
+        with pytest.raises(ValueError):
+            OrderIndex.load(io.BytesIO(data[:cut]))
+
+
+def test_unknown_order_rejected_before_verification():
+    index = OrderIndex(capacity_per_partition=1000)
+    client = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY, order_index=index)
+
+    assert client.verify_callback(signed_callback(client, order_no="RIDE_1")) is None
+    assert index.unknown == 1
+
+    index.add("RIDE_1")
+    assert client.verify_callback(signed_callback(client, order_no="RIDE_1")) is not None
+
+
+def test_fail_open_admits_unknown_orders():
+    index = OrderIndex(capacity_per_partition=1000, fail_open=True)
+    client = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY, order_index=index)
+
+    assert client.verify_callback(signed_callback(client, order_no="OTHER_WORKER")) is not None
+    assert index.unknown == 1
+
+
+def test_failing_shared_store_does_not_drop_callbacks():
+    class Unreachable:
+        def add(self, order_no):
+            pass
+
+        def admits(self, order_no):
+            raise ConnectionError("store down")
+
+    client = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY, order_index=Unreachable())
+
+    assert client.verify_callback(signed_callback(client)) is not None
+    bad = dict(signed_callback(client), amount="1.0")
+    assert client.verify_callback(bad) is None
+
+
+def test_failing_shared_store_add_does_not_fail_payment(client, caplog):
+    class ReadOnly:
+        def add(self, order_no):
+            raise ConnectionError("store down")
+
+        def admits(self, order_no):
+            return True
+
+    indexed = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY, order_index=ReadOnly())
+    request = PaymentRequest(
+        transaction=TransactionDetails(
+            order_no="RIDE_1", amount=250,
+            success_url="https://example.com/s", failure_url="https://example.com/f",
+        ),
+        customer=CustomerDetails(cust_name="Abebe", email_id="abebe@example.com", mobile_no="0911234567"),
+    )
+
+    assert indexed.create_payment(request) == client.create_payment(request)
+    assert "Order index add failed" in caplog.text
@@ -0,0 +1,73 @@
+import importlib
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from yagoutpay import CustomerDetails, PaymentRequest, TransactionDetails
+from yagoutpay import client as client_module
+
+from conftest import ENCRYPTION_KEY, MERCHANT_ID
+
+REQUEST = PaymentRequest(
+    transaction=TransactionDetails(
+        order_no="RIDE_1", amount=250,
+        success_url="https://example.com/s", failure_url="https://example.com/f",
+    ),
+    customer=CustomerDetails(cust_name="Abebe Kebede", email_id="abebe@example.com", mobile_no="0911234567"),
+)
+
+BOOKING = {
+    "customer_name": "Abebe Kebede",
+    "email_id": "abebe@example.com",
+    "mobile_no": "0911234567",
+    "pickup_address": "Bole Road",
+    "dropoff_address": "Piazza",
+    "distance": 5,
+    "ride_type": "comfort",
+    "amount": 275,
+}
+
+
+def test_orjson_output_matches_payment_response(client):
+    pytest.importorskip("orjson")
+    assert client_module.orjson is not None
+
+    body = client.create_payment_json(REQUEST)
+
+    assert json.loads(body) == client.create_payment(REQUEST).model_dump()
+
+
+def test_json_fallback_without_orjson(client, monkeypatch):
+    monkeypatch.setattr(client_module, "orjson", None)
+
+    body = client.create_payment_json(REQUEST)
+
+    assert isinstance(body, bytes)
+    assert b" " not in body
+    assert json.loads(body) == client.create_payment(REQUEST).model_dump()
+
+
+@pytest.fixture(scope="module")
+def demo():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("MERCHANT_ID", MERCHANT_ID)
+        mp.setenv("ENCRYPTION_KEY", ENCRYPTION_KEY)
+        mp.setenv("ADMISSION_CONTROL", "off")
+        yield TestClient(importlib.import_module("demo.main").app)
+
+
+def test_demo_api_returns_gateway_fields(demo):
+    response = demo.post("/api/payments", json=BOOKING)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert set(response.json()) == {"me_id", "merchant_request", "hash", "post_url"}
+
+
+def test_demo_api_rejects_invalid_customer_fields(demo):
+    response = demo.post("/api/payments", json=dict(BOOKING, email_id="not-an-email", mobile_no="123"))
+
+    assert response.status_code == 422
+    fields = {error["loc"][-1] for error in response.json()["detail"]}
+    assert {"email_id", "mobile_no"} <= fields
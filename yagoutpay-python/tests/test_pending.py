@@ -0,0 +1,158 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from yagoutpay import PendingPaymentTracker, YagoutPay
+
+from conftest import ENCRYPTION_KEY, MERCHANT_ID, signed_callback
+
+# A whole second ahead of the wall clock, so make_tracker can jump the wheel to it
+NOW = float(int(time.time()) + 1000)
+
+
+def make_tracker(**kwargs):
+    tracker = PendingPaymentTracker(**kwargs)
+    tracker.advance(NOW)
+    return tracker
+
+
+def test_order_expires_at_its_deadline():
+    tracker = make_tracker(timeout=10)
+    tracker.track("o1", now=NOW)
+
+    assert tracker.advance(NOW + 9) == []
+    assert "o1" in tracker
+    assert tracker.advance(NOW + 10) == ["o1"]
+    assert "o1" not in tracker
+    assert tracker.expired == 1
+
+
+def test_resolved_order_never_expires():
+    tracker = make_tracker(timeout=10)
+    tracker.track("o1", now=NOW)
+
+    assert tracker.resolve("o1") is True
+    assert tracker.resolve("o1") is False
+    assert tracker.advance(NOW + 100) == []
+    assert tracker.resolved == 1
+    assert len(tracker) == 0
+
+
+def test_callback_on_another_worker_resolves_via_on_unknown():
+    workers = []
+
+    def broadcast(order_no):
+        for tracker in workers:
+            tracker.resolve(order_no, forward=False)
+
+    issuer = make_tracker(timeout=10, on_unknown=broadcast)
+    receiver = make_tracker(timeout=10, on_unknown=broadcast)
+    workers.extend([issuer, receiver])
+    issuer.track("o1", now=NOW)
+
+    client = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY, pending_tracker=receiver)
+    assert client.verify_callback(signed_callback(client, order_no="o1")) is not None
+
+    assert "o1" not in issuer
+    assert issuer.advance(NOW + 100) == []
+    assert (issuer.resolved, receiver.unknown) == (1, 2)
+
+
+def test_failing_on_unknown_hook_is_counted(caplog):
+    def hook(order_no):
+        raise ConnectionError("bus down")
+
+    tracker = make_tracker(on_unknown=hook)
+
+    assert tracker.resolve("o1") is False
+    assert tracker.resolve("o1", forward=False) is False
+    assert (tracker.unknown, tracker.hook_errors) == (2, 1)
+    assert "on_unknown hook failed" in caplog.text
+
+
+def test_retracking_replaces_the_deadline():
+    tracker = make_tracker(timeout=10)
+    tracker.track("o1", now=NOW)
+    tracker.track("o1", timeout=30, now=NOW)
+
+    assert tracker.advance(NOW + 20) == []
+    assert tracker.advance(NOW + 30) == ["o1"]
+
+
+def test_long_timeouts_cascade_through_levels():
+    # 8 slots per level: level 0 covers 8 ticks, level 1 64, level 2 512
+    tracker = make_tracker(timeout=10, wheel_size=8, levels=3)
+    timeouts = {"short": 5, "level1": 40, "level2": 300, "beyond": 2000}
+    for order_no, timeout in timeouts.items():
+        tracker.track(order_no, timeout=timeout, now=NOW)
+
+    fired = {}
+    for second in range(1, 2001):
+        for order_no in tracker.advance(NOW + second):
+            fired[order_no] = second
+
+    assert fired == timeouts
+
+
+def test_matches_brute_force_model():
+    rng = random.Random(7)
+    tracker = make_tracker(timeout=50, wheel_size=4, levels=3)
+    deadlines = {}
+    now = NOW
+    for step in range(3000):
+        now += rng.choice([0, 1, 1, 2, 5])
+        action = rng.random()
+        order_no = f"o{rng.randrange(200)}"
+        if action < 0.4:
+            timeout = rng.choice([1, 3, 17, 60, 200])
+            tracker.track(order_no, timeout=timeout, now=now)
+            deadlines[order_no] = max(int(now + timeout), int(now) + 1)
+        elif action < 0.6:
+            assert tracker.resolve(order_no) == (deadlines.pop(order_no, None) is not None)
+        expected = sorted(o for o, d in deadlines.items() if d <= int(now))
+        for order_no in expected:
+            del deadlines[order_no]
+        assert sorted(tracker.advance(now)) == expected
+        assert len(tracker) == len(deadlines)
+
+
+def test_failing_hook_does_not_stop_expiry(caplog):
+    seen_first, seen_second = [], []
+
+    def first(order_no):
+        seen_first.append(order_no)
+        raise RuntimeError("release failed")
+
+    tracker = make_tracker(timeout=10, on_expire=first)
+    tracker.add_expiry_hook(seen_second.append)
+    for n in range(3):
+        tracker.track(f"o{n}", now=NOW)
+
+    assert sorted(tracker.advance(NOW + 10)) == ["o0", "o1", "o2"]
+    assert sorted(seen_first) == ["o0", "o1", "o2"]
+    assert sorted(seen_second) == ["o0", "o1", "o2"]
+    assert tracker.hook_errors == 3
+    assert "Expiry hook" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_run_survives_failing_hook():
+    expired = []
+
+    def hook(order_no):
+        expired.append(order_no)
+        raise RuntimeError("boom")
+
+    tracker = PendingPaymentTracker(timeout=0.02, tick=0.01, on_expire=hook)
+    task = asyncio.ensure_future(tracker.run())
+    try:
+        tracker.track("o1")
+        await asyncio.sleep(0.06)
+        tracker.track("o2")
+        await asyncio.sleep(0.06)
+    finally:
+        task.cancel()
+
+    assert expired == ["o1", "o2"]
@@ -0,0 +1,207 @@
+"""
+Status queries against a local stub gateway
+
+The stub runs under uvicorn on a free port and answers according to the
+order number prefix, so every failure mode is deterministic: ``OK_`` orders
+succeed after a short delay, ``ERR_`` get HTTP 500, ``GARBAGE_`` an
+undecryptable body, ``HANG_`` never answer in time, ``BIG_`` an oversized
+body and ``WRONG_`` a reply for another order.
+"""
+
+import asyncio
+import json
+import socket
+from collections import Counter
+from urllib.parse import parse_qsl
+
+import pytest
+import pytest_asyncio
+import uvicorn
+
+from yagoutpay import YagoutPay
+
+from conftest import ENCRYPTION_KEY, MERCHANT_ID
+
+pytest.importorskip("httpx")
+
+REQUEST_TIMEOUT = 0.5
+
+
+class StubGateway:
+    """ASGI stub of the gateway status inquiry endpoint"""
+
+    def __init__(self, client: YagoutPay):
+        self.crypto = client.crypto
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.peers = set()
+        self.requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.requests += 1
+        self.peers.add(scope["client"])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            body = b""
+            more_body = True
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                body += message.get("body", b"")
+                more_body = message.get("more_body", False)
+            fields = dict(parse_qsl(body.decode()))
+            _, order_no = self.crypto.aes_decrypt_base64(fields["merchant_request"]).split("|", 1)
+
+            await asyncio.sleep(0.01)
+            if order_no.startswith("HANG_"):
+                # The client gives up on this request and frees its slot
+                self.in_flight -= 1
+                await asyncio.sleep(REQUEST_TIMEOUT * 4)
+                self.in_flight += 1
+                return
+            if order_no.startswith("ERR_"):
+                await self.respond(send, 500, {"error": "internal error"})
+            elif order_no.startswith("GARBAGE_"):
+                await self.respond(send, 200, {"merchant_response": "not-encrypted"})
+            elif order_no.startswith("BIG_"):
+                await self.respond(send, 200, {"padding": "x" * (YagoutPay.MAX_STATUS_RESPONSE_SIZE + 1)})
+            else:
+                reply_for = "SOMEONE_ELSE" if order_no.startswith("WRONG_") else order_no
+                await self.respond(send, 200, self.status_reply(reply_for, "SUCCESS"))
+        finally:
+            self.in_flight -= 1
+
+    def status_reply(self, order_no, status, amount="250.0"):
+        plaintext = f"{status}|{order_no}|{amount}|TXN123|BANK1|00|OK"
+        return {
+            "merchant_response": self.crypto.aes_encrypt_base64(plaintext),
+            "hash": self.crypto.aes_encrypt_base64(self.crypto.sha256_hex(f"{order_no}{amount}{status}")),
+        }
+
+    @staticmethod
+    async def respond(send, status, payload):
+        body = json.dumps(payload).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest_asyncio.fixture
+async def gateway():
+    port = free_port()
+    client = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY, status_url=f"http://127.0.0.1:{port}/status")
+    stub = StubGateway(client)
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=port, log_level="error"))
+    server_task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    yield client, stub
+    server.should_exit = True
+    server.force_exit = True
+    await server_task
+
+
+async def collect(client, order_nos, **kwargs):
+    return [result async for result in client.query_statuses(order_nos, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_single_query(gateway):
+    client, _ = gateway
+    status = await client.query_status("OK_1", timeout=REQUEST_TIMEOUT)
+
+    assert (status.order_no, status.status, status.amount, status.txn_id) == ("OK_1", "SUCCESS", "250.0", "TXN123")
+    assert status.error is None
+
+
+@pytest.mark.asyncio
+async def test_every_order_gets_one_result_within_concurrency(gateway):
+    client, stub = gateway
+    order_nos = [f"OK_{n}" for n in range(200)]
+
+    results = await collect(client, iter(order_nos), concurrency=10, timeout=REQUEST_TIMEOUT)
+
+    assert Counter(r.order_no for r in results) == Counter(order_nos)
+    assert all(r.status == "SUCCESS" and r.error is None for r in results)
+    assert stub.max_in_flight <= 10
+    # Keep-alive: far fewer connections than requests
+    assert len(stub.peers) <= 10 < stub.requests
+
+
+@pytest.mark.asyncio
+async def test_failures_become_per_order_errors(gateway):
+    client, _ = gateway
+    order_nos = ["OK_1", "ERR_1", "GARBAGE_1", "HANG_1", "BIG_1", "WRONG_1"]
+
+    results = {r.order_no: r for r in await collect(client, order_nos, concurrency=6, timeout=REQUEST_TIMEOUT)}
+
+    assert set(results) == set(order_nos)
+    assert results["OK_1"].error is None
+    assert "HTTP 500" in results["ERR_1"].error
+    assert "decrypt" in results["GARBAGE_1"].error
+    assert results["HANG_1"].error == "timed out"
+    assert results["BIG_1"].error == "Status response too large"
+    assert "SOMEONE_ELSE" in results["WRONG_1"].error
+
+
+@pytest.mark.asyncio
+async def test_deadline_yields_remaining_orders_unqueried(gateway):
+    client, stub = gateway
+    order_nos = [f"HANG_{n}" for n in range(4)] + [f"OK_{n}" for n in range(20)]
+
+    results = await collect(client, order_nos, concurrency=4, timeout=10, deadline=0.2)
+
+    assert Counter(r.order_no for r in results) == Counter(order_nos)
+    assert all(r.error == "deadline exceeded" for r in results)
+    assert stub.requests == 4
+
+
+@pytest.mark.asyncio
+async def test_early_exit_cancels_outstanding_queries(gateway):
+    client, _ = gateway
+    order_nos = ["OK_0"] + [f"HANG_{n}" for n in range(5)]
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    results = client.query_statuses(order_nos, concurrency=6, timeout=10)
+    async for result in results:
+        assert result.order_no == "OK_0"
+        break
+    await results.aclose()
+
+    # The hung queries were cancelled rather than awaited
+    assert loop.time() - start < REQUEST_TIMEOUT
+
+
+@pytest.mark.asyncio
+async def test_status_url_required():
+    client = YagoutPay(MERCHANT_ID, ENCRYPTION_KEY)
+
+    with pytest.raises(ValueError):
+        await client.query_status("OK_1")
+    with pytest.raises(ValueError):
+        await collect(client, ["OK_1"])
+
+
+def test_status_query_layout_is_overridable():
+    class CustomLayout(YagoutPay):
+        STATUS_REQUEST_FORMAT = "{order_no}"
+
+    client = CustomLayout(MERCHANT_ID, ENCRYPTION_KEY)
+    fields = client.build_status_query("OK_1")
+
+    assert client.crypto.aes_decrypt_base64(fields["merchant_request"]) == "OK_1"
+    assert fields["me_id"] == MERCHANT_ID